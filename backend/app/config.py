@@ -2,10 +2,13 @@
 Application configuration settings.
 """
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, Optional, Tuple
 
-from pydantic_settings import BaseSettings
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
@@ -17,15 +20,15 @@ class Settings(BaseSettings):
     API_DESCRIPTION: str = "Enterprise-grade API for IFC building model analysis"
 
     # CORS Settings - allow all origins for now (will be protected by login)
-    CORS_ORIGINS: List[str] = ["*"]
+    CORS_ORIGINS: Tuple[str, ...] = ("*",)
 
     # File Settings - uploads folder for IFC files
-    IFC_DIRECTORY: Path = Path(__file__).parent.parent.parent / "uploads"
-    ALLOWED_EXTENSIONS: List[str] = [".ifc"]
+    IFC_DIRECTORY: Path = Path(__file__).resolve().parent.parent.parent / "uploads"
+    ALLOWED_EXTENSIONS: FrozenSet[str] = frozenset({".ifc"})
     MAX_FILE_SIZE_MB: int = 500
 
     # Output Directories - all outputs go to outputs folder
-    OUTPUT_DIRECTORY: Path = Path(__file__).parent.parent.parent / "outputs"
+    OUTPUT_DIRECTORY: Path = Path(__file__).resolve().parent.parent.parent / "outputs"
     TAKEOFFS_DIR: str = "takeoffs"
     STOREY_IFCS_DIR: str = "storey_ifcs"
     EXPORTS_DIR: str = "exports"
@@ -34,9 +37,31 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4.1-mini"
 
-    class Config:
-        env_file = ".env"
-        extra = "ignore"
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
+    @field_validator("IFC_DIRECTORY", "OUTPUT_DIRECTORY")
+    @classmethod
+    def resolve_directory(cls, value: Path) -> Path:
+        """Resolve overrides once so file operations get an absolute path."""
+        return value.resolve()
 
-settings = Settings()
+    @property
+    def cors_allow_origins(self) -> FrozenSet[str]:
+        """Exact CORS origins (and "*"), checked by set membership."""
+        return frozenset(o for o in self.CORS_ORIGINS if o == "*" or "*" not in o)
+
+    @property
+    def cors_allow_origin_regex(self) -> Optional[str]:
+        """Wildcard CORS origins (e.g. "https://*.vercel.app") as one regex."""
+        patterns = [
+            re.escape(o).replace(r"\*", r"[^.]+")
+            for o in self.CORS_ORIGINS
+            if o != "*" and "*" in o
+        ]
+        return "|".join(patterns) or None
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, built on first use."""
+    return Settings()
@@ -6,15 +6,70 @@ Works with any IFC file by detecting grids, zones, and element relationships.
 import ifcopenshell
 import ifcopenshell.util.placement as placement
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field, asdict
-from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from operator import attrgetter, itemgetter
 import math
 import json
 import re
 import numpy as np
 
 
-@dataclass
+# IFC classes extracted as structural elements. Every element's ifc_type
+# references one of these shared string objects.
+STRUCTURAL_IFC_TYPES = (
+    'IfcColumn', 'IfcBeam', 'IfcMember', 'IfcPlate',
+    'IfcSlab', 'IfcWall', 'IfcWallStandardCase',
+    'IfcFooting', 'IfcStair', 'IfcRailing'
+)
+
+# IFC classes included in building-section queries (structural and everything else)
+_ALL_BUILDING_TYPES = (
+    'IfcWall', 'IfcWallStandardCase', 'IfcCurtainWall',
+    'IfcSlab', 'IfcRoof',
+    'IfcColumn', 'IfcBeam', 'IfcMember', 'IfcPlate',
+    'IfcFooting', 'IfcPile',
+    'IfcStair', 'IfcStairFlight', 'IfcRamp', 'IfcRampFlight',
+    'IfcRailing',
+    'IfcDoor', 'IfcWindow',
+    'IfcCovering',
+    'IfcBuildingElementProxy',
+    'IfcDistributionElement', 'IfcFlowSegment', 'IfcFlowTerminal',
+    'IfcFurnishingElement', 'IfcFurniture',
+)
+
+# Short display names for levels, checked in order: (substrings, short name)
+_LEVEL_KEYWORDS = (
+    (('footing', 'foundation'), 'FTG'),
+    (('mezzanine', 'mezz'), 'Mezz'),
+    (('roof', 'ridge'), 'Roof'),
+    (('basement',), 'B1'),
+)
+_GROUND_LEVEL_NAMES = frozenset({'ground', 'ground floor', 'gf', 'ground level'})
+_LEVEL_N_RE = re.compile(r'level\s*(\d+)')
+_BARE_LN_RE = re.compile(r'^l(\d+)$')
+_DIGITS_RE = re.compile(r'\d+')
+
+
+def _natural_key(tag: str) -> Tuple[int, str]:
+    """Sort key for grid tags: by the first number in the tag, then by the tag itself."""
+    match = _DIGITS_RE.search(tag)
+    return (int(match.group()) if match else 0, tag)
+
+
+def _u_tag_key(tag: str) -> int:
+    """Grid-reference order of a U (letter) tag: by its first letter"""
+    return ord(tag[0].upper()) if tag else 0
+
+
+def _v_tag_key(tag: str) -> int:
+    """Grid-reference order of a V (number) tag: numerically, non-numeric tags first"""
+    return int(tag) if tag.isdigit() else 0
+
+
+@dataclass(slots=True)
 class GridAxis:
     """Represents a single grid axis (e.g., 'A' or '1')"""
     tag: str
@@ -22,10 +77,14 @@ class GridAxis:
     position: float  # Coordinate position in mm
 
     def to_dict(self):
-        return asdict(self)
+        return {
+            'tag': self.tag,
+            'direction': self.direction,
+            'position': self.position
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class GridCell:
     """Represents a grid cell (intersection of two axes)"""
     u_axis: str  # e.g., 'A'
@@ -34,10 +93,10 @@ class GridCell:
     x_max: float
     y_min: float
     y_max: float
+    name: str = field(init=False)  # e.g., 'A-1'
 
-    @property
-    def name(self) -> str:
-        return f"{self.u_axis}-{self.v_axis}"
+    def __post_init__(self):
+        self.name = f"{self.u_axis}-{self.v_axis}"
 
     def to_dict(self):
         return {
@@ -51,7 +110,7 @@ class GridCell:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class StructuralElement:
     """Represents a structural element with its position and properties"""
     global_id: str
@@ -80,7 +139,7 @@ class StructuralElement:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ErectionZone:
     """Represents an erection zone (group of grid cells to be erected together)"""
     zone_id: int
@@ -103,7 +162,7 @@ class ErectionZone:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ErectionStage:
     """Represents a single erection stage within a zone"""
     stage_id: str  # e.g., "2.1"
@@ -144,14 +203,105 @@ class ErectionMethodologyService:
     # Standard structural element types for erection sequencing
     # Each IFC type appears in exactly ONE category to prevent double-counting
     STRUCTURAL_TYPES = {
-        'columns': ['IfcColumn'],
-        'beams': ['IfcBeam'],
-        'bracing': ['IfcMember', 'IfcPlate'],  # Bracing members, fly bracing, gussets
-        'slabs': ['IfcSlab'],
-        'walls': ['IfcWall', 'IfcWallStandardCase'],
-        'footings': ['IfcFooting'],
-        'stairs': ['IfcStair', 'IfcStairFlight'],
-        'railings': ['IfcRailing'],
+        'columns': frozenset({'IfcColumn'}),
+        'beams': frozenset({'IfcBeam'}),
+        'bracing': frozenset({'IfcMember', 'IfcPlate'}),  # Bracing members, fly bracing, gussets
+        'slabs': frozenset({'IfcSlab'}),
+        'walls': frozenset({'IfcWall', 'IfcWallStandardCase'}),
+        'footings': frozenset({'IfcFooting'}),
+        'stairs': frozenset({'IfcStair', 'IfcStairFlight'}),
+        'railings': frozenset({'IfcRailing'}),
+    }
+
+    # Reverse index: IFC type -> its primary (first listed) category
+    TYPE_TO_CATEGORY = {
+        ifc_type: category
+        for category, types in reversed(STRUCTURAL_TYPES.items())
+        for ifc_type in types
+    }
+
+    # Stage phases per zone, in build order. Each phase runs over every level
+    # (bottom-up) before the next phase starts.
+    # Primary structural elements MUST be built in order; slabs come LAST
+    # because they sit on beams
+    PRIMARY_SEQUENCE = ('footings', 'columns', 'beams', 'bracing', 'slabs')
+    # Secondary elements after primary structure is stable
+    SECONDARY_SEQUENCE = ('walls', 'stairs', 'railings')
+    STAGE_PHASES = (PRIMARY_SEQUENCE, SECONDARY_SEQUENCE)
+
+    # Standard erection instructions per element type, filled in by
+    # _generate_stage_instructions ({level} is empty or ends with a space)
+    _INSTRUCTION_TEMPLATES = {
+        'footings': (
+            "Install all {count} footings/foundations in {zone}",
+            "Verify ground preparation and excavation complete",
+            "Check levels and alignment before placement",
+            "Allow concrete to cure before loading with columns",
+        ),
+        'columns': (
+            "Erect all {count} {level}columns in {zone}",
+            "Progress bay by bay from one end to the other",
+            "Columns to be plumbed, aligned, and snug tightened",
+            "Temporary bracing to be installed as required for stability",
+        ),
+        'beams': (
+            "Install all {count} {level}beams in {zone}",
+            "Install primary beams first, then secondary beams",
+            "Progress bay by bay following column installation",
+            "Snug tighten all bolts",
+        ),
+        'bracing': (
+            "Install all {count} {level}bracing members in {zone}",
+            "Install wall struts, headers and cross bracing as per drawings",
+            "Tension bracing where applicable",
+            "Snug tighten all bolts",
+        ),
+        'slabs': (
+            "Install all {count} {level}slab/floor elements in {zone}",
+            "Ensure all supporting columns and beams are complete and tightened",
+            "Verify structure stability before slab installation",
+            "Install in sequence following structural drawings",
+        ),
+        'walls': (
+            "Install all {count} {level}wall elements in {zone}",
+            "Ensure supporting structure is complete",
+            "Install after primary frame is stable",
+        ),
+        'stairs': (
+            "Install all {count} {level}stair elements in {zone}",
+            "Verify supporting structure is complete and stable",
+            "Install temporary safety barriers as required",
+        ),
+        'railings': (
+            "Install all {count} {level}railing elements in {zone}",
+            "Install after associated stairs/floors are complete",
+            "Verify all connections and fixings secure",
+        ),
+    }
+
+    # Rosehill-style instructions for user-defined sequences, by element type
+    _ROSEHILL_TEMPLATES = {
+        'footings': (
+            "Install all {count} foundations in {grid_range}",
+            "Foundations to be placed bay by bay from grid {u_start} through to grid {u_end}",
+            "Verify foundation levels and alignment before grouting",
+            "All holding-down bolts to be checked for position and projection",
+            "Foundations must be signed off before column erection begins",
+        ),
+        'columns': (
+            "Erect all {count} columns in {grid_range}",
+            "Columns to be installed bay by bay from grid {u_start} through to grid {u_end}",
+            "Columns to be plumbed, aligned, and snug tightened",
+            "Temporary bracing to be installed as required to maintain stability",
+            "Check column plumb and alignment before proceeding to beams",
+        ),
+        'beams': (
+            "Install all {count} beams and bracing in {grid_range}",
+            "Install beams in each bay from grid {u_start} through grid {u_end}",
+            "Install wall struts, headers and cross bracing as per drawings",
+            "Snug tighten all bolts and tension bracing where applicable",
+            "Ensure all connections are secure before releasing crane",
+        ),
     }
 
     # Standard erection sequence order - STRUCTURAL LOGIC:
@@ -169,20 +319,81 @@ class ErectionMethodologyService:
         self.elements: Dict[str, StructuralElement] = {}
         self.zones: Dict[int, ErectionZone] = {}
         self.stages: List[ErectionStage] = []
+        self._stage_by_id: Dict[str, ErectionStage] = {}  # rebuilt by _rebuild_stage_index
+        self._stages_sorted = False  # stages ordered by (zone_id, stage_id) and numbered in that order
+        self._element_dicts: Dict[str, Dict[str, Any]] = {}  # global_id -> to_dict(), filled on demand
         self.levels: Dict[str, float] = {}  # level_name -> elevation
+        self._sorted_levels: List[Tuple[str, float]] = []  # (level_name, elevation), bottom-up
 
         # Analysis results
         self._analyzed = False
         self._grid_detected = False
 
+        # Sorted axis positions and (u_index, v_index) -> cell name, for O(log n) cell lookup
+        self._u_positions = np.empty(0)
+        self._v_positions = np.empty(0)
+        self._cell_index: Dict[Tuple[int, int], str] = {}
+
+        # Axis lookups derived from grid_axes for grid-area queries, built on
+        # first use by _ensure_grid_caches and dropped by _invalidate_grid_caches
+        self._grid_caches_valid = False
+        self._u_tags: List[str] = []  # U tags in grid-reference order
+        self._v_tags: List[str] = []  # V tags in grid-reference order
+        self._u_tag_to_idx: Dict[str, int] = {}
+        self._v_tag_to_idx: Dict[str, int] = {}
+        self._u_axis_by_tag: Dict[str, GridAxis] = {}
+        self._v_axis_by_tag: Dict[str, GridAxis] = {}
+        self._grid_positions_valid = False
+
+        # Cell center coordinate of each U column / V row; cells form a product
+        # grid, so the nearest cell is the nearest column paired with the nearest row
+        self._u_centers = np.empty(0)
+        self._v_centers = np.empty(0)
+        self._cell_center_x = np.empty(0)  # per cell, in self.grid_cells insertion order
+        self._cell_center_y = np.empty(0)
+
+        # Element express_id -> containing storey name / property sets
+        self._elem_to_storey: Dict[int, str] = {}
+        self._elem_to_psets: Dict[int, list] = {}
+
+        # Element positions, express ids and type codes as parallel arrays
+        # (in self.elements order) for vectorized area queries
+        self._elem_x = np.empty(0)
+        self._elem_y = np.empty(0)
+        self._elem_express_id = np.empty(0, dtype=np.int64)
+        self._elem_type_code = np.empty(0, dtype=np.int64)
+        self._type_codes: Dict[str, int] = {}
+        self._category_codes: Dict[str, np.ndarray] = {}  # category -> type codes it covers
+        self._elem_bounds = (0.0, 0.0, 0.0, 0.0)  # (x_min, x_max, y_min, y_max) of all elements
+        self._by_express_id: Dict[int, StructuralElement] = {}  # express_id -> element
+
+        # Element indices ordered by x, and the x values in that order, so an
+        # area query only looks at the x-slab it overlaps
+        self._x_order = np.empty(0, dtype=np.intp)
+        self._x_sorted = np.empty(0)
+
+        # Ids and X/Y of every IFC building element (not just structural) for
+        # section queries, ordered by X so a query only scans its x-slab.
+        # Built on first use by _ensure_building_element_arrays
+        self._building_ids: Optional[np.ndarray] = None
+        self._building_x = np.empty(0)
+        self._building_y = np.empty(0)
+
+        # (zone_id, level, category) -> element global_ids, filled by _detect_zones
+        self._zone_level_category: Dict[Tuple[int, str, str], List[str]] = defaultdict(list)
+
     def analyze(self) -> Dict[str, Any]:
         """Run full analysis of the IFC file"""
         self._extract_levels()
         self._extract_grid_system()
+        self._index_relationships()
         self._extract_structural_elements()
+        self._build_element_arrays()
         self._map_elements_to_grid()
         self._detect_zones()
         self._generate_stages()
+        self._rebuild_stage_index()
+        self._element_dicts = {}  # elements were (re)mapped; drop any stale dicts
         self._analyzed = True
 
         return self.get_analysis_summary()
@@ -196,7 +407,8 @@ class ErectionMethodologyService:
             self.levels[name] = elevation
 
         # Sort levels by elevation
-        self.levels = dict(sorted(self.levels.items(), key=lambda x: x[1]))
+        self._sorted_levels = sorted(self.levels.items(), key=itemgetter(1))
+        self.levels = dict(self._sorted_levels)
 
     def _extract_grid_system(self):
         """Extract grid axes from IFC"""
@@ -222,8 +434,7 @@ class ErectionMethodologyService:
 
             # Extract U axes (typically letters like A, B, C)
             if grid.UAxes:
-                for axis in grid.UAxes:
-                    pos = self._get_axis_position(axis, grid_placement)
+                for axis, pos in zip(grid.UAxes, self._get_axis_positions(grid.UAxes, grid_placement)):
                     if pos is not None:
                         u_axes.append(GridAxis(
                             tag=axis.AxisTag or f"U{len(u_axes)}",
@@ -233,8 +444,7 @@ class ErectionMethodologyService:
 
             # Extract V axes (typically numbers like 1, 2, 3)
             if grid.VAxes:
-                for axis in grid.VAxes:
-                    pos = self._get_axis_position(axis, grid_placement)
+                for axis, pos in zip(grid.VAxes, self._get_axis_positions(grid.VAxes, grid_placement)):
                     if pos is not None:
                         v_axes.append(GridAxis(
                             tag=axis.AxisTag or f"V{len(v_axes)}",
@@ -243,18 +453,19 @@ class ErectionMethodologyService:
                         ))
 
         # Remove duplicates (same tag) — multiple IfcGrid entities may repeat axes at different levels
+        self._invalidate_grid_caches()
         seen_u = set()
         seen_v = set()
         unique_u = []
         unique_v = []
 
-        for a in sorted(u_axes, key=lambda a: a.position):
+        for a in sorted(u_axes, key=attrgetter('position')):
             if a.tag not in seen_u:
                 seen_u.add(a.tag)
                 unique_u.append(a)
                 self.grid_axes[f"U_{a.tag}"] = a
 
-        for a in sorted(v_axes, key=lambda a: a.position):
+        for a in sorted(v_axes, key=attrgetter('position')):
             if a.tag not in seen_v:
                 seen_v.add(a.tag)
                 unique_v.append(a)
@@ -286,19 +497,14 @@ class ErectionMethodologyService:
         # If axes are horizontal lines (constant Y, varying X), their positions are Y values
         # Since we already extracted the constant coordinate, we can check the spread
         # and compare with element positions later.
-        # For now, we rely on the _get_axis_position logic which already determines
+        # For now, we rely on the _get_axis_positions logic which already determines
         # the constant coordinate correctly.
-        return True  # Will be determined by _get_axis_position's coordinate choice
+        return True  # Will be determined by _get_axis_positions' coordinate choice
 
-    def _get_axis_position(self, axis, grid_placement) -> Optional[float]:
+    def _get_axis_points(self, axis) -> Optional[Tuple[List[float], Optional[List[float]]]]:
         """
-        Get the position coordinate of a grid axis.
-
-        Determines the constant coordinate of the axis line:
-        - A vertical line (running in Y) has constant X → returns X
-        - A horizontal line (running in X) has constant Y → returns Y
-
-        Applies grid placement transformation to get world coordinates.
+        Get the local start and end point of a grid axis curve, padded to 3D.
+        The end point is None when the curve has only one point.
         """
         curve = axis.AxisCurve
         if not curve:
@@ -327,43 +533,67 @@ class ErectionMethodologyService:
             # Ensure 3D coordinates
             while len(p1_local) < 3:
                 p1_local.append(0.0)
-
-            # Apply grid placement transformation to get world coordinates
-            if grid_placement is not None:
-                p1_world = np.dot(grid_placement, p1_local + [1.0])[:3]
-            else:
-                p1_world = p1_local
-
             if p2_local is not None:
                 while len(p2_local) < 3:
                     p2_local.append(0.0)
-                if grid_placement is not None:
-                    p2_world = np.dot(grid_placement, p2_local + [1.0])[:3]
-                else:
-                    p2_world = p2_local
-
-                # Determine the constant coordinate:
-                # If |dx| < |dy|, the line runs vertically → X is constant → position = X
-                # If |dy| < |dx|, the line runs horizontally → Y is constant → position = Y
-                dx = abs(p2_world[0] - p1_world[0])
-                dy = abs(p2_world[1] - p1_world[1])
-
-                if dx < dy:
-                    # Vertical line → position is the constant X coordinate
-                    return float((p1_world[0] + p2_world[0]) / 2.0)
-                else:
-                    # Horizontal line → position is the constant Y coordinate
-                    return float((p1_world[1] + p2_world[1]) / 2.0)
-            else:
-                # Only one point available, can't determine direction
-                # Return X as default
-                return float(p1_world[0])
+
+            return [float(c) for c in p1_local[:3]], (
+                [float(c) for c in p2_local[:3]] if p2_local is not None else None
+            )
 
         except Exception:
             pass
 
         return None
 
+    def _get_axis_positions(self, axes, grid_placement) -> List[Optional[float]]:
+        """
+        Get the position coordinate of each grid axis (None where it has no usable curve).
+
+        Determines the constant coordinate of each axis line:
+        - A vertical line (running in Y) has constant X → returns X
+        - A horizontal line (running in X) has constant Y → returns Y
+
+        All end points of the grid are moved to world coordinates with one
+        matrix product against the grid placement.
+        """
+        positions: List[Optional[float]] = [None] * len(axes)
+        points = [self._get_axis_points(axis) for axis in axes]
+        valid = [k for k, pts in enumerate(points) if pts is not None]
+        if not valid:
+            return positions
+
+        # Rows: start points of the valid axes, then their end points (the start
+        # point again where there is no end point)
+        p1_local = np.array([points[k][0] for k in valid], dtype=np.float64)
+        p2_local = np.array([points[k][1] or points[k][0] for k in valid], dtype=np.float64)
+        local = np.vstack([p1_local, p2_local])
+
+        # Apply grid placement transformation to get world coordinates
+        if grid_placement is not None:
+            homogeneous = np.hstack([local, np.ones((len(local), 1))])
+            world = (homogeneous @ np.asarray(grid_placement, dtype=np.float64).T)[:, :3]
+        else:
+            world = local
+        p1_world, p2_world = world[:len(valid)], world[len(valid):]
+        has_end = np.array([points[k][1] is not None for k in valid])
+
+        # Determine the constant coordinate:
+        # If |dx| < |dy|, the line runs vertically → X is constant → position = X
+        # If |dy| < |dx|, the line runs horizontally → Y is constant → position = Y
+        # With only one point the direction is unknown and X is the default
+        # (p2 == p1 there, so the X midpoint is p1's X)
+        dx = np.abs(p2_world[:, 0] - p1_world[:, 0])
+        dy = np.abs(p2_world[:, 1] - p1_world[:, 1])
+        mid_x = (p1_world[:, 0] + p2_world[:, 0]) / 2.0
+        mid_y = (p1_world[:, 1] + p2_world[:, 1]) / 2.0
+        axis_positions = np.where(has_end & (dx >= dy), mid_y, mid_x)
+
+        for k, pos in zip(valid, axis_positions.tolist()):
+            positions[k] = pos
+
+        return positions
+
     def _create_grid_cells(self, u_axes: List[GridAxis], v_axes: List[GridAxis]):
         """
         Create grid cells from axis intersections.
@@ -388,97 +618,193 @@ class ErectionMethodologyService:
         # Typically, one set spans in X and the other in Y.
         # We'll use the convention: U-axis positions → one world coordinate,
         # V-axis positions → the other.
-        # The _get_axis_position already returns the constant coordinate of each line.
+        # _get_axis_positions already returns the constant coordinate of each line.
+
+        us = np.array(u_positions, dtype=np.float64)
+        vs = np.array(v_positions, dtype=np.float64)
 
+        # U-axes are typically vertical lines → their position is X
+        # V-axes are typically horizontal lines → their position is Y
+        x_lo, x_hi = np.minimum(us[:-1], us[1:]), np.maximum(us[:-1], us[1:])
+        y_lo, y_hi = np.minimum(vs[:-1], vs[1:]), np.maximum(vs[:-1], vs[1:])
+
+        x_lo_list, x_hi_list = x_lo.tolist(), x_hi.tolist()
+        y_lo_list, y_hi_list = y_lo.tolist(), y_hi.tolist()
         for i, u in enumerate(u_axes[:-1]):
-            u_next = u_axes[i + 1]
             for j, v in enumerate(v_axes[:-1]):
-                v_next = v_axes[j + 1]
-
-                # U-axes are typically vertical lines → their position is X
-                # V-axes are typically horizontal lines → their position is Y
                 cell = GridCell(
                     u_axis=u.tag,
                     v_axis=v.tag,
-                    x_min=min(u.position, u_next.position),
-                    x_max=max(u.position, u_next.position),
-                    y_min=min(v.position, v_next.position),
-                    y_max=max(v.position, v_next.position)
+                    x_min=x_lo_list[i],
+                    x_max=x_hi_list[i],
+                    y_min=y_lo_list[j],
+                    y_max=y_hi_list[j]
                 )
                 self.grid_cells[cell.name] = cell
+                self._cell_index[(i, j)] = cell.name
+
+        num_v_cells = len(y_lo)
+        num_u_cells = len(x_lo)
+        self._u_positions = us
+        self._v_positions = vs
+        self._u_centers = (x_lo + x_hi) / 2
+        self._v_centers = (y_lo + y_hi) / 2
+        self._cell_center_x = np.repeat(self._u_centers, num_v_cells)
+        self._cell_center_y = np.tile(self._v_centers, num_u_cells)
+
+    def _index_relationships(self):
+        """Index storey containment and property sets by element in one forward
+        scan of the relationship tables, instead of walking each element's inverses"""
+        # Rebuilt from scratch so a re-run doesn't append to the previous index
+        self._elem_to_storey = {}
+        self._elem_to_psets = {}
+
+        for rel in self.ifc.by_type('IfcRelContainedInSpatialStructure'):
+            structure = rel.RelatingStructure
+            if not (structure and structure.is_a('IfcBuildingStorey')):
+                continue
+            storey_name = structure.Name or f"Level_{structure.id()}"
+            for obj in rel.RelatedElements or []:
+                self._elem_to_storey.setdefault(obj.id(), storey_name)
+
+        # Property sets per element in file (relationship id) order, which sets
+        # the precedence in _get_element_properties
+        for rel in sorted(self.ifc.by_type('IfcRelDefinesByProperties'), key=lambda r: r.id()):
+            pset = rel.RelatingPropertyDefinition
+            for obj in rel.RelatedObjects or []:
+                self._elem_to_psets.setdefault(obj.id(), []).append(pset)
 
     def _extract_structural_elements(self):
         """Extract all structural elements with their positions"""
-        structural_ifc_types = [
-            'IfcColumn', 'IfcBeam', 'IfcMember', 'IfcPlate',
-            'IfcSlab', 'IfcWall', 'IfcWallStandardCase',
-            'IfcFooting', 'IfcStair', 'IfcRailing'
-        ]
-
-        for ifc_type in structural_ifc_types:
-            elements = self.ifc.by_type(ifc_type)
-            for elem in elements:
+        # Collect placement matrices first so positions come from one batched slice.
+        # by_type() includes subtypes, so e.g. IfcWallStandardCase also comes back
+        # from the IfcWall query: keep one entry per entity (labelled with the last
+        # matching type) and only compute its placement once.
+        entities: Dict[int, list] = {}
+        matrices = []
+        for ifc_type in STRUCTURAL_IFC_TYPES:
+            for elem in self.ifc.by_type(ifc_type):
+                entry = entities.get(elem.id())
+                if entry is not None:
+                    entry[0] = ifc_type
+                    continue
                 try:
-                    # Get element position
-                    matrix = placement.get_local_placement(elem.ObjectPlacement)
-                    x, y, z = matrix[0][3], matrix[1][3], matrix[2][3]
-
-                    # Determine level
-                    level = self._get_element_level(elem, z)
-
-                    # Get properties
-                    props = self._get_element_properties(elem)
-
-                    struct_elem = StructuralElement(
-                        global_id=elem.GlobalId,
-                        express_id=elem.id(),  # ExpressID for 3D viewer highlighting
-                        ifc_type=ifc_type,
-                        name=elem.Name or f"{ifc_type}_{elem.id()}",
-                        x=x,
-                        y=y,
-                        z=z,
-                        level=level,
-                        properties=props
-                    )
-                    self.elements[elem.GlobalId] = struct_elem
-                except Exception as e:
+                    matrices.append(placement.get_local_placement(elem.ObjectPlacement))
+                except Exception:
                     continue
+                entities[elem.id()] = [ifc_type, elem]
+
+        if not entities:
+            return
+
+        positions = np.stack(matrices)[:, :3, 3]
+        fallback_levels = self._nearest_levels(positions[:, 2])
+
+        for (ifc_type, elem), (x, y, z), fallback_level in zip(
+            entities.values(), positions.tolist(), fallback_levels
+        ):
+            try:
+                # Determine level
+                level = self._get_element_level(elem, fallback_level)
+
+                # Get properties
+                props = self._get_element_properties(elem)
+
+                struct_elem = StructuralElement(
+                    global_id=elem.GlobalId,
+                    express_id=elem.id(),  # ExpressID for 3D viewer highlighting
+                    ifc_type=ifc_type,
+                    name=elem.Name or f"{ifc_type}_{elem.id()}",
+                    x=x,
+                    y=y,
+                    z=z,
+                    level=level,
+                    properties=props
+                )
+                self.elements[elem.GlobalId] = struct_elem
+            except Exception:
+                continue
 
-    def _get_element_level(self, elem, z: float) -> str:
-        """Determine which level an element belongs to based on its Z coordinate"""
-        # First try to get from spatial containment
-        for rel in self.ifc.get_inverse(elem):
-            if rel.is_a('IfcRelContainedInSpatialStructure'):
-                structure = rel.RelatingStructure
-                if structure and structure.is_a('IfcBuildingStorey'):
-                    return structure.Name or f"Level_{structure.id()}"
+    def _build_element_arrays(self):
+        """Copy element positions, express ids and type codes into NumPy arrays"""
+        elements = list(self.elements.values())
+        n = len(elements)
+        self._type_codes = {ifc_type: code for code, ifc_type in enumerate(STRUCTURAL_IFC_TYPES)}
+        self._elem_x = np.fromiter((e.x for e in elements), dtype=np.float64, count=n)
+        self._elem_y = np.fromiter((e.y for e in elements), dtype=np.float64, count=n)
+        self._elem_express_id = np.fromiter((e.express_id for e in elements), dtype=np.int64, count=n)
+        self._by_express_id = {e.express_id: e for e in elements}
+        self._elem_type_code = np.fromiter(
+            (self._type_codes.setdefault(e.ifc_type, len(self._type_codes)) for e in elements),
+            dtype=np.int64, count=n
+        )
+        self._category_codes = {
+            category: np.array([self._type_codes[t] for t in types if t in self._type_codes], dtype=np.int64)
+            for category, types in self.STRUCTURAL_TYPES.items()
+        }
+        self._x_order = np.argsort(self._elem_x, kind='stable')
+        self._x_sorted = self._elem_x[self._x_order]
+        if n:
+            self._elem_bounds = (
+                float(self._elem_x.min()), float(self._elem_x.max()),
+                float(self._elem_y.min()), float(self._elem_y.max()),
+            )
 
-        # Fall back to Z-coordinate matching
-        closest_level = None
-        min_diff = float('inf')
+    def _express_ids_in_area(self, x_min: float, x_max: float, y_min: float, y_max: float,
+                             element_type: str = None) -> List[int]:
+        """ExpressIDs of elements inside the (inclusive) box, optionally of one category"""
+        # Candidates from the sorted-x index, then an exact y (and type) test
+        lo = np.searchsorted(self._x_sorted, x_min, side='left')
+        hi = np.searchsorted(self._x_sorted, x_max, side='right')
+        candidates = self._x_order[lo:hi]
+
+        ys = self._elem_y[candidates]
+        mask = (ys >= y_min) & (ys <= y_max)
+        if element_type:
+            allowed = self._category_codes.get(element_type)
+            if allowed is None:
+                return []
+            mask &= np.isin(self._elem_type_code[candidates], allowed)
 
-        for level_name, elevation in self.levels.items():
-            diff = abs(z - elevation)
-            if diff < min_diff:
-                min_diff = diff
-                closest_level = level_name
+        # Back to element order
+        return self._elem_express_id[np.sort(candidates[mask])].tolist()
 
-        return closest_level or "Unknown"
+    def _nearest_levels(self, zs: np.ndarray) -> List[str]:
+        """Match each Z coordinate to the level with the closest elevation"""
+        if not self.levels:
+            return ["Unknown"] * len(zs)
+
+        level_names = [name for name, _ in self._sorted_levels]
+        if len(level_names) == 1:
+            return level_names * len(zs)
+
+        # Levels are sorted by elevation, so the closest one is one of the two
+        # neighbours of z; ties go to the lower level as in a plain argmin
+        elevations = np.array([elev for _, elev in self._sorted_levels], dtype=np.float64)
+        hi = np.clip(np.searchsorted(elevations, zs), 1, len(elevations) - 1)
+        lo = np.searchsorted(elevations, elevations[hi - 1])
+        closest = np.where(np.abs(zs - elevations[lo]) <= np.abs(zs - elevations[hi]), lo, hi)
+        return [level_names[i] for i in closest.tolist()]
+
+    def _get_element_level(self, elem, fallback_level: str) -> str:
+        """Determine which level an element belongs to.
+        Uses spatial containment, falling back to the Z-matched level."""
+        return self._elem_to_storey.get(elem.id(), fallback_level)
 
     def _get_element_properties(self, elem) -> Dict[str, Any]:
-        """Extract relevant properties from an element"""
+        """Extract relevant properties from an element.
+        When several property sets define the same property name (e.g. Reference,
+        IsExternal, LoadBearing), the last property set in file order wins."""
         props = {}
 
-        for rel in self.ifc.get_inverse(elem):
-            if rel.is_a('IfcRelDefinesByProperties'):
-                pset = rel.RelatingPropertyDefinition
-                if hasattr(pset, 'HasProperties'):
-                    for prop in pset.HasProperties:
-                        try:
-                            if hasattr(prop, 'NominalValue') and prop.NominalValue:
-                                props[prop.Name] = prop.NominalValue.wrappedValue
-                        except:
-                            pass
+        for pset in self._elem_to_psets.get(elem.id(), []):
+            if hasattr(pset, 'HasProperties'):
+                for prop in pset.HasProperties:
+                    try:
+                        if hasattr(prop, 'NominalValue') and prop.NominalValue:
+                            props[prop.Name] = prop.NominalValue.wrappedValue
+                    except Exception:
+                        pass
 
         return props
 
@@ -488,25 +814,44 @@ class ErectionMethodologyService:
             # If no grid detected, create virtual grid from element positions
             self._create_virtual_grid()
 
-        for elem in self.elements.values():
-            cell_name = self._find_grid_cell(elem.x, elem.y)
-            elem.grid_cell = cell_name
+        elements = list(self.elements.values())
+        u_pos = self._u_positions
+        v_pos = self._v_positions
+
+        if not elements or not self._cell_index:
+            for elem in elements:
+                elem.grid_cell = None
+            return
+
+        # Cells partition the axis-aligned grid, so inside it the containing cell
+        # is found by bisecting the sorted axis positions (lowest index wins on
+        # shared edges). Outside it, take the nearest cell center: squared
+        # distance is dx^2 + dy^2, so minimise over columns and rows separately
+        xs = self._elem_x
+        ys = self._elem_y
+        iu = np.clip(np.searchsorted(u_pos, xs) - 1, 0, len(u_pos) - 2)
+        iv = np.clip(np.searchsorted(v_pos, ys) - 1, 0, len(v_pos) - 2)
+        outside = ~((xs >= u_pos[0]) & (xs <= u_pos[-1]) & (ys >= v_pos[0]) & (ys <= v_pos[-1]))
+        if outside.any():
+            iu[outside] = np.abs(xs[outside, None] - self._u_centers).argmin(axis=1)
+            iv[outside] = np.abs(ys[outside, None] - self._v_centers).argmin(axis=1)
+
+        cell_index = self._cell_index
+        for elem, i, j in zip(elements, iu.tolist(), iv.tolist()):
+            elem.grid_cell = cell_index[(i, j)]
 
     def _create_virtual_grid(self):
         """Create a virtual grid based on element positions when no IFC grid exists"""
         if not self.elements:
             return
 
-        # Collect all positions
-        xs = [e.x for e in self.elements.values()]
-        ys = [e.y for e in self.elements.values()]
-
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
+        x_min, x_max, y_min, y_max = self._elem_bounds
 
         # Create grid with ~10m spacing
         grid_spacing = 10000  # 10m in mm
 
+        self._invalidate_grid_caches()
+
         # Create U axes (X direction — letters, matching IFC convention)
         u_axes = []
         x_pos = x_min
@@ -537,27 +882,6 @@ class ErectionMethodologyService:
         self._create_grid_cells(u_axes, v_axes)
         self._grid_detected = False  # Mark as virtual grid
 
-    def _find_grid_cell(self, x: float, y: float) -> Optional[str]:
-        """Find which grid cell contains the given coordinates"""
-        for cell in self.grid_cells.values():
-            if (cell.x_min <= x <= cell.x_max and
-                cell.y_min <= y <= cell.y_max):
-                return cell.name
-
-        # If not found in any cell, find nearest cell
-        min_dist = float('inf')
-        nearest = None
-
-        for cell in self.grid_cells.values():
-            cx = (cell.x_min + cell.x_max) / 2
-            cy = (cell.y_min + cell.y_max) / 2
-            dist = math.sqrt((x - cx)**2 + (y - cy)**2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = cell.name
-
-        return nearest
-
     def _detect_zones(self):
         """
         Auto-detect erection zones based on element distribution.
@@ -568,15 +892,16 @@ class ErectionMethodologyService:
         - Zones are detected by finding natural breaks in element clustering
         - Each zone should be a manageable construction area (~30m x 30m)
         """
+        # Rebuilt from scratch so a re-run doesn't append to the previous zones
+        self.zones = {}
+        self._zone_level_category = defaultdict(list)
+
         if not self.elements:
             return
 
         # Get element position ranges
-        xs = [e.x for e in self.elements.values()]
-        ys = [e.y for e in self.elements.values()]
-
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
+        xs, ys = self._elem_x, self._elem_y
+        x_min, x_max, y_min, y_max = self._elem_bounds
 
         x_range = x_max - x_min
         y_range = y_max - y_min
@@ -594,38 +919,56 @@ class ErectionMethodologyService:
         zone_width = x_range / num_x_zones if num_x_zones > 0 else x_range
         zone_height = y_range / num_y_zones if num_y_zones > 0 else y_range
 
+        # Zone (i, j) covers [zone_x_min, zone_x_min + zone_width) x
+        # [zone_y_min, zone_y_min + zone_height), the same bounds it reports as
+        # x_range / y_range. Membership is one vectorized test per zone column and
+        # row against exactly those bounds, so a point on the far edge (or in a
+        # rounding gap between zones) is left out just as the reported range says.
+        zone_x_bounds = [
+            (x_min + i * zone_width, x_min + i * zone_width + zone_width)
+            for i in range(num_x_zones)
+        ]
+        zone_y_bounds = [
+            (y_min + j * zone_height, y_min + j * zone_height + zone_height)
+            for j in range(num_y_zones)
+        ]
+        elem_in_column = [(xs >= lo) & (xs < hi) for lo, hi in zone_x_bounds]
+        elem_in_row = [(ys >= lo) & (ys < hi) for lo, hi in zone_y_bounds]
+        elements = list(self.elements.values())
+
+        cells = list(self.grid_cells.values())
+        cell_xs, cell_ys = self._cell_center_x, self._cell_center_y
+        cell_in_column = [(cell_xs >= lo) & (cell_xs < hi) for lo, hi in zone_x_bounds]
+        cell_in_row = [(cell_ys >= lo) & (cell_ys < hi) for lo, hi in zone_y_bounds]
+
+        type_to_category = self.TYPE_TO_CATEGORY
+        zone_level_category = self._zone_level_category
         zone_id = 1
 
         # Create zones in a grid pattern - progress row by row (Y direction first for bays)
         for j in range(num_y_zones):
             for i in range(num_x_zones):
-                zone_x_min = x_min + i * zone_width
-                zone_x_max = zone_x_min + zone_width
-                zone_y_min = y_min + j * zone_height
-                zone_y_max = zone_y_min + zone_height
-
-                # Find grid cells in this zone
-                zone_cells = []
-                for cell in self.grid_cells.values():
-                    cell_center_x = (cell.x_min + cell.x_max) / 2
-                    cell_center_y = (cell.y_min + cell.y_max) / 2
-                    if (zone_x_min <= cell_center_x < zone_x_max and
-                        zone_y_min <= cell_center_y < zone_y_max):
-                        zone_cells.append(cell.name)
-
-                # Find elements in this zone
+                zone_x_min, zone_x_max = zone_x_bounds[i]
+                zone_y_min, zone_y_max = zone_y_bounds[j]
+
+                # Grid cells in this zone
+                zone_grid_cells = [
+                    cells[k] for k in np.flatnonzero(cell_in_column[i] & cell_in_row[j]).tolist()
+                ] if cells else []
+                zone_cells = [cell.name for cell in zone_grid_cells]
+
+                # Elements in this zone
                 zone_elements = []
-                element_counts = defaultdict(int)
-
-                for elem in self.elements.values():
-                    if (zone_x_min <= elem.x < zone_x_max and
-                        zone_y_min <= elem.y < zone_y_max):
-                        zone_elements.append(elem.global_id)
-                        # Categorize element
-                        for category, types in self.STRUCTURAL_TYPES.items():
-                            if elem.ifc_type in types:
-                                element_counts[category] += 1
-                                break
+                element_counts = Counter()
+
+                for k in np.flatnonzero(elem_in_column[i] & elem_in_row[j]).tolist():
+                    elem = elements[k]
+                    zone_elements.append(elem.global_id)
+                    # Categorize element
+                    category = type_to_category.get(elem.ifc_type)
+                    if category:
+                        element_counts[category] += 1
+                        zone_level_category[(zone_id, elem.level, category)].append(elem.global_id)
 
                 # Skip empty zones
                 if not zone_elements:
@@ -635,17 +978,12 @@ class ErectionMethodologyService:
                 zone_name = f"Zone {zone_id}"
                 if zone_cells:
                     # Get U-axis range (letters) and V-axis range (numbers)
-                    u_tags = set()
-                    v_tags = set()
-                    for cell_name in zone_cells:
-                        parts = cell_name.split('-')
-                        if len(parts) == 2:
-                            u_tags.add(parts[0])
-                            v_tags.add(parts[1])
+                    u_tags = {cell.u_axis for cell in zone_grid_cells}
+                    v_tags = {cell.v_axis for cell in zone_grid_cells}
 
                     if u_tags and v_tags:
                         u_sorted = sorted(u_tags)
-                        v_sorted = sorted(v_tags, key=lambda x: int(x) if x.isdigit() else 0)
+                        v_sorted = sorted(v_tags, key=_natural_key)
                         zone_name = f"Grid {v_sorted[0]}-{v_sorted[-1]} / {u_sorted[0]}-{u_sorted[-1]}"
 
                 zone = ErectionZone(
@@ -685,202 +1023,84 @@ class ErectionMethodologyService:
           ...
         """
         stage_counter = 1
+        sub_counters = defaultdict(int)  # zone_id -> stages created so far
+        self.stages = []
+        self._stages_sorted = False
 
         # Get sorted levels (lowest elevation first = ground up)
-        sorted_levels = sorted(self.levels.items(), key=lambda x: x[1])
-
-        # Primary structural elements that MUST be built in order
-        # Slabs come LAST because they sit on beams
-        PRIMARY_SEQUENCE = ['footings', 'columns', 'beams', 'bracing', 'slabs']
-        # Secondary elements after primary structure is stable
-        SECONDARY_SEQUENCE = ['walls', 'stairs', 'railings']
-
-        for zone in sorted(self.zones.values(), key=lambda z: z.zone_id):
-            # Get elements in this zone grouped by level
-            elements_by_level = defaultdict(list)
-            for eid in zone.elements:
-                elem = self.elements.get(eid)
-                if elem:
-                    elements_by_level[elem.level].append(eid)
-
-            # FIRST: Build primary structure level by level
-            for level_name, level_elevation in sorted_levels:
-                level_elements = elements_by_level.get(level_name, [])
-                if not level_elements:
-                    continue
+        sorted_levels = self._sorted_levels
 
-                # Build primary structure in order
-                for element_type in PRIMARY_SEQUENCE:
-                    stage_elements = [
-                        eid for eid in level_elements
-                        if self.elements[eid].ifc_type in self.STRUCTURAL_TYPES.get(element_type, [])
-                    ]
+        # Zone elements are already bucketed by (zone, level, category) in _detect_zones
+        zone_level_category = self._zone_level_category
 
-                    if not stage_elements:
-                        continue
+        for zone in sorted(self.zones.values(), key=attrgetter('zone_id')):
+            # Primary structure level by level, then secondary elements
+            # (walls, stairs, railings) once the primary structure is complete
+            for phase in self.STAGE_PHASES:
+                for level_name, level_elevation in sorted_levels:
+                    for element_type in phase:
+                        stage_elements = zone_level_category.get((zone.zone_id, level_name, element_type))
 
-                    sub_stage = len([s for s in self.stages if s.zone_id == zone.zone_id]) + 1
-                    stage_id = f"{zone.zone_id}.{sub_stage}"
-                    level_short = self._get_short_level_name(level_name)
-
-                    instructions = self._generate_stage_instructions(
-                        element_type, zone, len(stage_elements), level_short
-                    )
-
-                    stage = ErectionStage(
-                        stage_id=stage_id,
-                        zone_id=zone.zone_id,
-                        name=f"Stage {stage_id} - {level_short} {element_type.title()}",
-                        description=f"Install {level_short} {element_type} in {zone.name}",
-                        element_type=element_type,
-                        grid_range=zone.name,
-                        elements=stage_elements,
-                        sequence_order=stage_counter,
-                        instructions=instructions
-                    )
-                    self.stages.append(stage)
-                    stage_counter += 1
-
-            # SECOND: Add secondary elements (walls, stairs, railings)
-            # These can be added after primary structure is complete
-            for level_name, level_elevation in sorted_levels:
-                level_elements = elements_by_level.get(level_name, [])
-                if not level_elements:
-                    continue
-
-                for element_type in SECONDARY_SEQUENCE:
-                    stage_elements = [
-                        eid for eid in level_elements
-                        if self.elements[eid].ifc_type in self.STRUCTURAL_TYPES.get(element_type, [])
-                    ]
-
-                    if not stage_elements:
-                        continue
+                        if not stage_elements:
+                            continue
 
-                    sub_stage = len([s for s in self.stages if s.zone_id == zone.zone_id]) + 1
-                    stage_id = f"{zone.zone_id}.{sub_stage}"
-                    level_short = self._get_short_level_name(level_name)
+                        sub_counters[zone.zone_id] += 1
+                        sub_stage = sub_counters[zone.zone_id]
+                        stage_id = f"{zone.zone_id}.{sub_stage}"
+                        level_short = self._get_short_level_name(level_name)
 
-                    instructions = self._generate_stage_instructions(
-                        element_type, zone, len(stage_elements), level_short
-                    )
+                        instructions = self._generate_stage_instructions(
+                            element_type, zone, len(stage_elements), level_short
+                        )
 
-                    stage = ErectionStage(
-                        stage_id=stage_id,
-                        zone_id=zone.zone_id,
-                        name=f"Stage {stage_id} - {level_short} {element_type.title()}",
-                        description=f"Install {level_short} {element_type} in {zone.name}",
-                        element_type=element_type,
-                        grid_range=zone.name,
-                        elements=stage_elements,
-                        sequence_order=stage_counter,
-                        instructions=instructions
-                    )
-                    self.stages.append(stage)
-                    stage_counter += 1
+                        stage = ErectionStage(
+                            stage_id=stage_id,
+                            zone_id=zone.zone_id,
+                            name=f"Stage {stage_id} - {level_short} {element_type.title()}",
+                            description=f"Install {level_short} {element_type} in {zone.name}",
+                            element_type=element_type,
+                            grid_range=zone.name,
+                            elements=list(stage_elements),
+                            sequence_order=stage_counter,
+                            instructions=instructions
+                        )
+                        self.stages.append(stage)
+                        stage_counter += 1
 
-    def _get_short_level_name(self, level_name: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _get_short_level_name(level_name: str) -> str:
         """Convert level name to short form for display.
-        Uses actual level name to avoid ambiguity (e.g. GROUND vs LEVEL 1)."""
+        Uses actual level name to avoid ambiguity (e.g. GROUND vs LEVEL 1).
+        Depends only on the name, so results are cached across stages and services."""
         level_lower = level_name.lower().strip()
 
         # Use the actual name — avoid conflating distinct levels
-        if 'footing' in level_lower or 'foundation' in level_lower:
-            return 'FTG'
-        elif level_lower in ['ground', 'ground floor', 'gf', 'ground level']:
+        if level_lower in _GROUND_LEVEL_NAMES:
             return 'GF'
-        elif 'mezzanine' in level_lower or 'mezz' in level_lower:
-            return 'Mezz'
-        elif 'roof' in level_lower or 'ridge' in level_lower:
-            return 'Roof'
-        elif 'basement' in level_lower:
-            return 'B1'
-        else:
-            # Try to extract "Level N" pattern
-            match = re.search(r'level\s*(\d+)', level_lower)
-            if match:
-                return f"L{match.group(1)}"
-            # Try bare number
-            match = re.search(r'^l(\d+)$', level_lower)
-            if match:
-                return f"L{match.group(1)}"
-            return level_name[:10]  # Truncate if too long
+        for keywords, short in _LEVEL_KEYWORDS:
+            if any(k in level_lower for k in keywords):
+                return short
+
+        # Try to extract "Level N" pattern, then a bare "LN"
+        match = _LEVEL_N_RE.search(level_lower) or _BARE_LN_RE.search(level_lower)
+        if match:
+            return f"L{match.group(1)}"
+        return level_name[:10]  # Truncate if too long
 
     def _generate_stage_instructions(self, element_type: str, zone: ErectionZone, count: int, level: str = '') -> List[str]:
         """Generate standard erection instructions for a stage"""
-        instructions = []
         level_str = f"{level} " if level else ""
-
-        if element_type == 'footings':
-            instructions = [
-                f"Install all {count} footings/foundations in {zone.name}",
-                "Verify ground preparation and excavation complete",
-                "Check levels and alignment before placement",
-                "Allow concrete to cure before loading with columns",
-            ]
-        elif element_type == 'columns':
-            instructions = [
-                f"Erect all {count} {level_str}columns in {zone.name}",
-                "Progress bay by bay from one end to the other",
-                "Columns to be plumbed, aligned, and snug tightened",
-                "Temporary bracing to be installed as required for stability",
-            ]
-        elif element_type == 'beams':
-            instructions = [
-                f"Install all {count} {level_str}beams in {zone.name}",
-                "Install primary beams first, then secondary beams",
-                "Progress bay by bay following column installation",
-                "Snug tighten all bolts",
-            ]
-        elif element_type == 'bracing':
-            instructions = [
-                f"Install all {count} {level_str}bracing members in {zone.name}",
-                "Install wall struts, headers and cross bracing as per drawings",
-                "Tension bracing where applicable",
-                "Snug tighten all bolts",
-            ]
-        elif element_type == 'slabs':
-            instructions = [
-                f"Install all {count} {level_str}slab/floor elements in {zone.name}",
-                "Ensure all supporting columns and beams are complete and tightened",
-                "Verify structure stability before slab installation",
-                "Install in sequence following structural drawings",
-            ]
-        elif element_type == 'walls':
-            instructions = [
-                f"Install all {count} {level_str}wall elements in {zone.name}",
-                "Ensure supporting structure is complete",
-                "Install after primary frame is stable",
-            ]
-        elif element_type == 'stairs':
-            instructions = [
-                f"Install all {count} {level_str}stair elements in {zone.name}",
-                "Verify supporting structure is complete and stable",
-                "Install temporary safety barriers as required",
-            ]
-        elif element_type == 'railings':
-            instructions = [
-                f"Install all {count} {level_str}railing elements in {zone.name}",
-                "Install after associated stairs/floors are complete",
-                "Verify all connections and fixings secure",
-            ]
-
-        return instructions
+        return [
+            template.format(count=count, level=level_str, zone=zone.name)
+            for template in self._INSTRUCTION_TEMPLATES.get(element_type, ())
+        ]
 
     def get_analysis_summary(self) -> Dict[str, Any]:
         """Get summary of the analysis"""
-        element_by_type = defaultdict(int)
-        element_by_level = defaultdict(int)
-        element_by_zone = defaultdict(int)
-
-        for elem in self.elements.values():
-            element_by_type[elem.ifc_type] += 1
-            element_by_level[elem.level] += 1
-            if elem.grid_cell:
-                for zone in self.zones.values():
-                    if elem.global_id in zone.elements:
-                        element_by_zone[zone.name] += 1
-                        break
+        elements = self.elements.values()
+        element_by_type = Counter(elem.ifc_type for elem in elements)
+        element_by_level = Counter(elem.level for elem in elements)
 
         return {
             'grid_detected': self._grid_detected,
@@ -902,8 +1122,8 @@ class ErectionMethodologyService:
         v_axes = [a.to_dict() for a in self.grid_axes.values() if a.direction == 'V']
 
         return {
-            'u_axes': sorted(u_axes, key=lambda a: a['position']),
-            'v_axes': sorted(v_axes, key=lambda a: a['position']),
+            'u_axes': sorted(u_axes, key=itemgetter('position')),
+            'v_axes': sorted(v_axes, key=itemgetter('position')),
             'cells': [c.to_dict() for c in self.grid_cells.values()],
             'is_virtual': not self._grid_detected
         }
@@ -914,22 +1134,39 @@ class ErectionMethodologyService:
         if not zone:
             return []
 
-        return [
-            self.elements[eid].to_dict()
-            for eid in zone.elements
-            if eid in self.elements
-        ]
+        return self._get_element_dicts(zone.elements)
+
+    def _rebuild_stage_index(self):
+        """Re-index stages by id after self.stages changes (first stage wins on duplicates)"""
+        self._stage_by_id = {}
+        for stage in self.stages:
+            self._stage_by_id.setdefault(stage.stage_id, stage)
+
+    def get_stage(self, stage_id: str) -> Optional[ErectionStage]:
+        """Get a stage by its id"""
+        return self._stage_by_id.get(stage_id)
 
     def get_elements_by_stage(self, stage_id: str) -> List[Dict[str, Any]]:
         """Get all elements in a specific stage"""
-        for stage in self.stages:
-            if stage.stage_id == stage_id:
-                return [
-                    self.elements[eid].to_dict()
-                    for eid in stage.elements
-                    if eid in self.elements
-                ]
-        return []
+        stage = self._stage_by_id.get(stage_id)
+        if stage is None:
+            return []
+        return self._get_element_dicts(stage.elements)
+
+    def _get_element_dicts(self, element_ids: List[str]) -> List[Dict[str, Any]]:
+        """Serialized elements for the given global ids, skipping unknown ids.
+        Elements don't change after analysis, so each is serialized once."""
+        cache = self._element_dicts
+        result = []
+        for eid in element_ids:
+            elem_dict = cache.get(eid)
+            if elem_dict is None:
+                elem = self.elements.get(eid)
+                if elem is None:
+                    continue
+                elem_dict = cache[eid] = elem.to_dict()
+            result.append(elem_dict)
+        return result
 
     def update_zone(self, zone_id: int, name: str = None,
                     x_range: Tuple[float, float] = None,
@@ -953,16 +1190,19 @@ class ErectionMethodologyService:
             effective_y = zone.y_range
 
             zone.elements = []
-            zone.element_counts = defaultdict(int)
-
-            for elem in self.elements.values():
-                if (effective_x[0] <= elem.x < effective_x[1] and
-                        effective_y[0] <= elem.y < effective_y[1]):
-                    zone.elements.append(elem.global_id)
-                    for category, types in self.STRUCTURAL_TYPES.items():
-                        if elem.ifc_type in types:
-                            zone.element_counts[category] += 1
-                            break
+            zone.element_counts = Counter()
+
+            # Containment test over the element position arrays in one pass
+            xs, ys = self._elem_x, self._elem_y
+            inside = ((xs >= effective_x[0]) & (xs < effective_x[1]) &
+                      (ys >= effective_y[0]) & (ys < effective_y[1]))
+            elements = list(self.elements.values())
+            for k in np.flatnonzero(inside).tolist():
+                elem = elements[k]
+                zone.elements.append(elem.global_id)
+                category = self.TYPE_TO_CATEGORY.get(elem.ifc_type)
+                if category:
+                    zone.element_counts[category] += 1
 
             zone.element_counts = dict(zone.element_counts)
 
@@ -974,101 +1214,74 @@ class ErectionMethodologyService:
     def _regenerate_zone_stages(self, zone_id: int):
         """Regenerate stages for a specific zone after update.
         Follows the same level-by-level logic as _generate_stages."""
-        # Remove existing stages for this zone
-        self.stages = [s for s in self.stages if s.zone_id != zone_id]
-
         zone = self.zones.get(zone_id)
         if not zone:
+            # Remove existing stages for this zone
+            self.stages = [s for s in self.stages if s.zone_id != zone_id]
+            self._rebuild_stage_index()
             return
 
-        # Recalculate element counts
-        element_counts = defaultdict(int)
-        for eid in zone.elements:
-            if eid in self.elements:
-                elem = self.elements[eid]
-                for category, types in self.STRUCTURAL_TYPES.items():
-                    if elem.ifc_type in types:
-                        element_counts[category] += 1
-                        break
-        zone.element_counts = dict(element_counts)
-
-        # Get sorted levels
-        sorted_levels = sorted(self.levels.items(), key=lambda x: x[1])
-        PRIMARY_SEQUENCE = ['footings', 'columns', 'beams', 'bracing', 'slabs']
-        SECONDARY_SEQUENCE = ['walls', 'stairs', 'railings']
-
-        # Group zone elements by level
-        elements_by_level = defaultdict(list)
+        # Recalculate element counts and group zone elements by (level, category)
+        element_counts = Counter()
+        elements_by_level_category = defaultdict(list)
         for eid in zone.elements:
             elem = self.elements.get(eid)
             if elem:
-                elements_by_level[elem.level].append(eid)
-
-        # Generate stages level-by-level (same logic as _generate_stages)
-        for level_name, _ in sorted_levels:
-            level_elements = elements_by_level.get(level_name, [])
-            if not level_elements:
-                continue
-
-            for element_type in PRIMARY_SEQUENCE:
-                stage_elements = [
-                    eid for eid in level_elements
-                    if self.elements[eid].ifc_type in self.STRUCTURAL_TYPES.get(element_type, [])
-                ]
-                if not stage_elements:
-                    continue
-
-                sub_stage = len([s for s in self.stages if s.zone_id == zone_id]) + 1
-                stage_id = f"{zone_id}.{sub_stage}"
-                level_short = self._get_short_level_name(level_name)
-
-                stage = ErectionStage(
-                    stage_id=stage_id,
-                    zone_id=zone_id,
-                    name=f"Stage {stage_id} - {level_short} {element_type.title()}",
-                    description=f"Install {level_short} {element_type} in {zone.name}",
-                    element_type=element_type,
-                    grid_range=zone.name,
-                    elements=stage_elements,
-                    sequence_order=0,
-                    instructions=self._generate_stage_instructions(element_type, zone, len(stage_elements), level_short)
-                )
-                self.stages.append(stage)
-
-        for level_name, _ in sorted_levels:
-            level_elements = elements_by_level.get(level_name, [])
-            if not level_elements:
-                continue
+                category = self.TYPE_TO_CATEGORY.get(elem.ifc_type)
+                if category:
+                    element_counts[category] += 1
+                    elements_by_level_category[(elem.level, category)].append(eid)
+        zone.element_counts = dict(element_counts)
 
-            for element_type in SECONDARY_SEQUENCE:
-                stage_elements = [
-                    eid for eid in level_elements
-                    if self.elements[eid].ifc_type in self.STRUCTURAL_TYPES.get(element_type, [])
-                ]
-                if not stage_elements:
-                    continue
+        # Get sorted levels
+        sorted_levels = self._sorted_levels
+
+        # Generate stages level-by-level (same logic as _generate_stages);
+        # this zone's old stages are gone, so numbering restarts at 1
+        sub_stage = 0
+        new_stages = []
+        for phase in self.STAGE_PHASES:
+            for level_name, _ in sorted_levels:
+                for element_type in phase:
+                    stage_elements = elements_by_level_category.get((level_name, element_type))
+                    if not stage_elements:
+                        continue
 
-                sub_stage = len([s for s in self.stages if s.zone_id == zone_id]) + 1
-                stage_id = f"{zone_id}.{sub_stage}"
-                level_short = self._get_short_level_name(level_name)
+                    sub_stage += 1
+                    stage_id = f"{zone_id}.{sub_stage}"
+                    level_short = self._get_short_level_name(level_name)
 
-                stage = ErectionStage(
-                    stage_id=stage_id,
-                    zone_id=zone_id,
-                    name=f"Stage {stage_id} - {level_short} {element_type.title()}",
-                    description=f"Install {level_short} {element_type} in {zone.name}",
-                    element_type=element_type,
-                    grid_range=zone.name,
-                    elements=stage_elements,
-                    sequence_order=0,
-                    instructions=self._generate_stage_instructions(element_type, zone, len(stage_elements), level_short)
-                )
-                self.stages.append(stage)
+                    stage = ErectionStage(
+                        stage_id=stage_id,
+                        zone_id=zone_id,
+                        name=f"Stage {stage_id} - {level_short} {element_type.title()}",
+                        description=f"Install {level_short} {element_type} in {zone.name}",
+                        element_type=element_type,
+                        grid_range=zone.name,
+                        elements=stage_elements,
+                        sequence_order=0,
+                        instructions=self._generate_stage_instructions(element_type, zone, len(stage_elements), level_short)
+                    )
+                    new_stages.append(stage)
+
+        if self._stages_sorted:
+            # Already in (zone_id, stage_id) order: replace this zone's run in
+            # place and renumber from there on
+            zone_key = attrgetter('zone_id')
+            lo = bisect_left(self.stages, zone_id, key=zone_key)
+            hi = bisect_right(self.stages, zone_id, key=zone_key)
+            new_stages.sort(key=attrgetter('stage_id'))
+            self.stages[lo:hi] = new_stages
+        else:
+            # Replace this zone's stages and reorder all stages
+            self.stages = [s for s in self.stages if s.zone_id != zone_id] + new_stages
+            self.stages.sort(key=attrgetter('zone_id', 'stage_id'))
+            self._stages_sorted = True
+            lo = 0
 
-        # Reorder all stages
-        self.stages.sort(key=lambda s: (s.zone_id, s.stage_id))
-        for i, stage in enumerate(self.stages):
-            stage.sequence_order = i + 1
+        for i in range(lo, len(self.stages)):
+            self.stages[i].sequence_order = i + 1
+        self._rebuild_stage_index()
 
     def generate_methodology_document(self) -> Dict[str, Any]:
         """Generate complete erection methodology document"""
@@ -1085,12 +1298,12 @@ class ErectionMethodologyService:
                 'grid_detected': self._grid_detected,
             },
             'grid_system': self.get_grid_data(),
-            'zones': [z.to_dict() for z in sorted(self.zones.values(), key=lambda z: z.zone_id)],
+            'zones': [z.to_dict() for z in sorted(self.zones.values(), key=attrgetter('zone_id'))],
             'erection_sequence': [],
         }
 
         # Generate sequence with full details
-        for stage in sorted(self.stages, key=lambda s: s.sequence_order):
+        for stage in sorted(self.stages, key=attrgetter('sequence_order')):
             zone = self.zones.get(stage.zone_id)
             stage_doc = stage.to_dict()
             stage_doc['zone_name'] = zone.name if zone else f"Zone {stage.zone_id}"
@@ -1104,22 +1317,23 @@ class ErectionMethodologyService:
         if not zone:
             return []
 
-        return [
-            self.elements[eid].express_id
-            for eid in zone.elements
-            if eid in self.elements
-        ]
+        return self._express_ids(zone.elements)
 
     def get_express_ids_by_stage(self, stage_id: str) -> List[int]:
         """Get ExpressIDs for all elements in a stage (for 3D viewer highlighting)"""
-        for stage in self.stages:
-            if stage.stage_id == stage_id:
-                return [
-                    self.elements[eid].express_id
-                    for eid in stage.elements
-                    if eid in self.elements
-                ]
-        return []
+        stage = self._stage_by_id.get(stage_id)
+        if stage is None:
+            return []
+        return self._express_ids(stage.elements)
+
+    def _express_ids(self, element_ids: List[str]) -> List[int]:
+        """ExpressIDs for the given global ids (one dict lookup each), skipping unknown ids"""
+        elements = self.elements
+        return [
+            elem.express_id
+            for elem in map(elements.get, element_ids)
+            if elem is not None
+        ]
 
     def get_all_express_ids(self) -> List[int]:
         """Get all structural element ExpressIDs"""
@@ -1145,54 +1359,73 @@ class ErectionMethodologyService:
         1. First tries to use valid grid axis positions
         2. Falls back to proportional division based on total grid count
         """
-        # Get all V and U axes sorted by position or tag
-        v_axes = sorted(
-            [a for k, a in self.grid_axes.items() if a.direction == 'V'],
-            key=lambda a: (int(a.tag) if a.tag.isdigit() else 0, a.position)
-        )
-        u_axes = sorted(
-            [a for k, a in self.grid_axes.items() if a.direction == 'U'],
-            key=lambda a: (ord(a.tag[0].upper()) if a.tag else 0, a.position)
-        )
+        self._ensure_grid_caches()
 
-        # Check if grid positions are valid (not all the same)
-        v_pos_set = set(a.position for a in v_axes) if v_axes else set()
-        u_pos_set = set(a.position for a in u_axes) if u_axes else set()
-        grid_positions_valid = len(v_pos_set) > 1 and len(u_pos_set) > 1
-
-        if grid_positions_valid:
+        if self._grid_positions_valid:
             # Use grid axis positions directly
             return self._get_express_ids_by_axis_positions(
-                v_start, v_end, u_start, u_end, v_axes, u_axes, element_type
+                v_start, v_end, u_start, u_end, element_type
             )
         else:
             # Use proportional coordinate-based approach
             return self._get_express_ids_by_proportional_grid(
-                v_start, v_end, u_start, u_end, v_axes, u_axes, element_type
+                v_start, v_end, u_start, u_end, element_type
             )
 
+    def _invalidate_grid_caches(self):
+        """Drop axis lookups derived from grid_axes (call whenever grid_axes changes)"""
+        self._grid_caches_valid = False
+
+    def _ensure_grid_caches(self):
+        """Build the sorted tag lists, tag lookups and position-valid flag once"""
+        if self._grid_caches_valid:
+            return
+
+        u_axes = [a for a in self.grid_axes.values() if a.direction == 'U']
+        v_axes = [a for a in self.grid_axes.values() if a.direction == 'V']
+
+        # Grid-reference order: letters alphabetically, numbers numerically
+        self._u_tags = [a.tag for a in sorted(
+            u_axes, key=lambda a: (_u_tag_key(a.tag), a.position)
+        )]
+        self._v_tags = [a.tag for a in sorted(
+            v_axes, key=lambda a: (_v_tag_key(a.tag), a.position)
+        )]
+        self._u_tag_to_idx = {tag: i for i, tag in enumerate(self._u_tags)}
+        self._v_tag_to_idx = {tag: i for i, tag in enumerate(self._v_tags)}
+        self._u_axis_by_tag = {a.tag: a for a in u_axes}
+        self._v_axis_by_tag = {a.tag: a for a in v_axes}
+
+        # Grid positions are usable only if they are not all the same
+        self._grid_positions_valid = (
+            len({a.position for a in v_axes}) > 1 and len({a.position for a in u_axes}) > 1
+        )
+        self._grid_caches_valid = True
+
+    def _axis_positions(self, start: str, end: str, axis_by_tag: Dict[str, GridAxis]) -> List[float]:
+        """Positions of the axes tagged start/end (one entry if they are the same axis)"""
+        return [axis_by_tag[tag].position for tag in dict.fromkeys((start, end)) if tag in axis_by_tag]
+
+    def _tag_index_range(self, start: str, end: str, tag_to_idx: Dict[str, int]) -> Tuple[int, int]:
+        """Ordered (start, end) indices of two tags; unknown tags widen to the grid edge"""
+        start_idx = tag_to_idx.get(start, 0)
+        end_idx = tag_to_idx.get(end, len(tag_to_idx) - 1)
+        return min(start_idx, end_idx), max(start_idx, end_idx)
+
     def _get_express_ids_by_axis_positions(
         self,
         v_start: str, v_end: str,
         u_start: str, u_end: str,
-        v_axes: List[GridAxis], u_axes: List[GridAxis],
         element_type: str = None
     ) -> List[int]:
         """Use actual grid axis positions for filtering.
         U-axis positions = X coordinates, V-axis positions = Y coordinates."""
-        u_positions = []
-        v_positions = []
-
-        for axis in u_axes:
-            if axis.tag in [u_start, u_end]:
-                u_positions.append(axis.position)
-        for axis in v_axes:
-            if axis.tag in [v_start, v_end]:
-                v_positions.append(axis.position)
+        u_positions = self._axis_positions(u_start, u_end, self._u_axis_by_tag)
+        v_positions = self._axis_positions(v_start, v_end, self._v_axis_by_tag)
 
         if len(u_positions) < 2 or len(v_positions) < 2:
             return self._get_express_ids_by_proportional_grid(
-                v_start, v_end, u_start, u_end, v_axes, u_axes, element_type
+                v_start, v_end, u_start, u_end, element_type
             )
 
         # U-axes are vertical lines → their positions are X coordinates
@@ -1203,28 +1436,21 @@ class ErectionMethodologyService:
         # Check if positions have meaningful spread (at least 1m difference)
         if abs(x_max - x_min) < 1000 or abs(y_max - y_min) < 1000:
             return self._get_express_ids_by_proportional_grid(
-                v_start, v_end, u_start, u_end, v_axes, u_axes, element_type
+                v_start, v_end, u_start, u_end, element_type
             )
 
         tolerance = 500
 
-        express_ids = []
-        for elem in self.elements.values():
-            if (x_min - tolerance <= elem.x <= x_max + tolerance and
-                y_min - tolerance <= elem.y <= y_max + tolerance):
-                if element_type:
-                    ifc_types = self.STRUCTURAL_TYPES.get(element_type, [])
-                    if elem.ifc_type not in ifc_types:
-                        continue
-                express_ids.append(elem.express_id)
-
-        return express_ids
+        return self._express_ids_in_area(
+            x_min - tolerance, x_max + tolerance,
+            y_min - tolerance, y_max + tolerance,
+            element_type
+        )
 
     def _get_express_ids_by_proportional_grid(
         self,
         v_start: str, v_end: str,
         u_start: str, u_end: str,
-        v_axes: List[GridAxis], u_axes: List[GridAxis],
         element_type: str = None
     ) -> List[int]:
         """
@@ -1234,113 +1460,54 @@ class ErectionMethodologyService:
         if not self.elements:
             return []
 
-        # Get element bounds
-        xs = [e.x for e in self.elements.values()]
-        ys = [e.y for e in self.elements.values()]
-
-        x_min, x_max = min(xs), max(xs)
-        y_min, y_max = min(ys), max(ys)
-        x_range = x_max - x_min if x_max > x_min else 1
-        y_range = y_max - y_min if y_max > y_min else 1
-
         # U-axis tags (letters) → X direction, V-axis tags (numbers) → Y direction
-        u_tags = sorted([a.tag for a in u_axes], key=lambda t: ord(t[0].upper()) if t else 0)
-        v_tags = sorted([a.tag for a in v_axes], key=lambda t: int(t) if t.isdigit() else 0)
-
-        if not u_tags or not v_tags:
+        self._ensure_grid_caches()
+        if not self._u_tags or not self._v_tags:
             # No grid axes, use all elements
             return self._filter_by_type(list(self.elements.values()), element_type)
 
-        # Calculate proportional bounds for U (X direction)
-        try:
-            u_start_idx = u_tags.index(u_start) if u_start in u_tags else 0
-            u_end_idx = u_tags.index(u_end) if u_end in u_tags else len(u_tags) - 1
-        except Exception:
-            u_start_idx = 0
-            u_end_idx = len(u_tags) - 1
-
-        # Calculate proportional bounds for V (Y direction)
-        try:
-            v_start_idx = v_tags.index(v_start) if v_start in v_tags else 0
-            v_end_idx = v_tags.index(v_end) if v_end in v_tags else len(v_tags) - 1
-        except Exception:
-            v_start_idx = 0
-            v_end_idx = len(v_tags) - 1
-
-        # Ensure proper ordering
-        u_start_idx, u_end_idx = min(u_start_idx, u_end_idx), max(u_start_idx, u_end_idx)
-        v_start_idx, v_end_idx = min(v_start_idx, v_end_idx), max(v_start_idx, v_end_idx)
-
-        # Calculate coordinate bounds as proportions of the building
-        num_u_divisions = len(u_tags)
-        num_v_divisions = len(v_tags)
-
-        # U-axes map to X, V-axes map to Y — add tolerance (extra half grid on each side)
-        x_start = x_min + (u_start_idx / num_u_divisions) * x_range - (x_range / num_u_divisions / 2)
-        x_end = x_min + ((u_end_idx + 1) / num_u_divisions) * x_range + (x_range / num_u_divisions / 2)
-        y_start = y_min + (v_start_idx / num_v_divisions) * y_range - (y_range / num_v_divisions / 2)
-        y_end = y_min + ((v_end_idx + 1) / num_v_divisions) * y_range + (y_range / num_v_divisions / 2)
-
         # Filter elements by coordinate bounds
-        express_ids = []
-        for elem in self.elements.values():
-            if x_start <= elem.x <= x_end and y_start <= elem.y <= y_end:
-                if element_type:
-                    ifc_types = self.STRUCTURAL_TYPES.get(element_type, [])
-                    if elem.ifc_type not in ifc_types:
-                        continue
-                express_ids.append(elem.express_id)
+        x_start, x_end, y_start, y_end = self._proportional_bounds(v_start, v_end, u_start, u_end)
+        return self._express_ids_in_area(x_start, x_end, y_start, y_end, element_type)
 
-        return express_ids
+    def _proportional_bounds(
+        self,
+        v_start: str, v_end: str,
+        u_start: str, u_end: str
+    ) -> Tuple[float, float, float, float]:
+        """
+        (x_min, x_max, y_min, y_max) of a grid area, taking each grid division as an
+        equal share of the element bounds. Needs the grid caches and at least one U and V tag.
+        """
+        x_min, x_max, y_min, y_max = self._elem_bounds
+        x_range = x_max - x_min if x_max > x_min else 1
+        y_range = y_max - y_min if y_max > y_min else 1
+
+        # Proportional index bounds for U (X direction) and V (Y direction)
+        u_start_idx, u_end_idx = self._tag_index_range(u_start, u_end, self._u_tag_to_idx)
+        v_start_idx, v_end_idx = self._tag_index_range(v_start, v_end, self._v_tag_to_idx)
+
+        # U-axes map to X, V-axes map to Y — add tolerance (extra half grid on each side).
+        # Keep the (idx / n) * range order: idx * (range / n) can round differently
+        # and move an element sitting exactly on a bound in or out of the area
+        num_u = len(self._u_tags)
+        num_v = len(self._v_tags)
+        half_x = x_range / num_u / 2
+        half_y = y_range / num_v / 2
+        return (
+            x_min + (u_start_idx / num_u) * x_range - half_x,
+            x_min + ((u_end_idx + 1) / num_u) * x_range + half_x,
+            y_min + (v_start_idx / num_v) * y_range - half_y,
+            y_min + ((v_end_idx + 1) / num_v) * y_range + half_y,
+        )
 
     def _filter_by_type(self, elements: List, element_type: str = None) -> List[int]:
         """Filter elements by type and return ExpressIDs"""
         if not element_type:
             return [e.express_id for e in elements]
 
-        ifc_types = self.STRUCTURAL_TYPES.get(element_type, [])
-        return [e.express_id for e in elements if e.ifc_type in ifc_types]
-
-    def _get_express_ids_by_grid_tags(
-        self,
-        v_start: str,
-        v_end: str,
-        u_start: str,
-        u_end: str,
-        element_type: str = None
-    ) -> List[int]:
-        """
-        Fallback method to get elements by grid cell tags when axis positions aren't found.
-        """
-        # Get V (number) range
-        try:
-            v_start_num = int(v_start)
-            v_end_num = int(v_end)
-            v_range = range(min(v_start_num, v_end_num), max(v_start_num, v_end_num) + 1)
-            v_tags = [str(n).zfill(2) if len(v_start) > 1 else str(n) for n in v_range]
-        except ValueError:
-            v_tags = [v_start, v_end]
-
-        # Get U (letter) range
-        u_start_ord = ord(u_start.upper())
-        u_end_ord = ord(u_end.upper())
-        u_tags = [chr(c) for c in range(min(u_start_ord, u_end_ord), max(u_start_ord, u_end_ord) + 1)]
-
-        # Find elements in matching grid cells
-        express_ids = []
-        for elem in self.elements.values():
-            if elem.grid_cell:
-                parts = elem.grid_cell.split('-')
-                if len(parts) == 2:
-                    cell_u, cell_v = parts[0], parts[1]
-                    if cell_u in u_tags and cell_v in v_tags:
-                        if element_type:
-                            ifc_types = self.STRUCTURAL_TYPES.get(element_type, [])
-                            if elem.ifc_type not in ifc_types:
-                                continue
-                        express_ids.append(elem.express_id)
-
-        return express_ids
+        return [e.express_id for e in elements
+                if self.TYPE_TO_CATEGORY.get(e.ifc_type) == element_type]
 
     def generate_from_user_sequences(self, sequences: List[Dict], include_footings: bool = True) -> List[Dict]:
         """
@@ -1371,18 +1538,23 @@ class ErectionMethodologyService:
         """
         # Clear existing stages and zones
         self.stages = []
+        self._stages_sorted = False
         self.zones = {}
 
         generated_stages = []
         stage_order = 1
 
-        # Build a reverse lookup: express_id → StructuralElement
-        express_to_elem = {e.express_id: e for e in self.elements.values()}
+        by_express_id = self._by_express_id
+        type_to_category = self.TYPE_TO_CATEGORY
+
+        # Zone element ids and per-type counts, accumulated as stages are created
+        zone_elements: Dict[int, List[str]] = defaultdict(list)
+        zone_counts: Dict[int, Counter] = defaultdict(Counter)
 
         for seq in sequences:
             seq_num = seq['sequence_number']
             grid = seq['grid_selection']
-            splits = sorted(seq.get('splits', []), key=lambda x: int(x) if x.isdigit() else 0)
+            splits = sorted(seq.get('splits', []), key=_v_tag_key)
 
             # Create list of v-axis ranges
             v_ranges = []
@@ -1414,21 +1586,21 @@ class ErectionMethodologyService:
                 )
 
                 # Resolve to element objects
-                area_elements = [express_to_elem[eid] for eid in all_area_ids if eid in express_to_elem]
+                area_elements = [e for e in map(by_express_id.get, all_area_ids) if e is not None]
 
                 if not area_elements:
                     continue
 
-                # Group elements by level
+                # Group elements by level, tracking each level's minimum Z in the same pass
                 level_groups: Dict[str, list] = defaultdict(list)
+                level_min_z: Dict[str, float] = {}
                 for elem in area_elements:
                     level_groups[elem.level].append(elem)
+                    if elem.z < level_min_z.get(elem.level, math.inf):
+                        level_min_z[elem.level] = elem.z
 
                 # Sort levels bottom-to-top by minimum Z coordinate
-                sorted_levels = sorted(
-                    level_groups.keys(),
-                    key=lambda lvl: min(e.z for e in level_groups[lvl])
-                )
+                sorted_levels = sorted(level_groups.keys(), key=level_min_z.__getitem__)
 
                 multi_level = len(sorted_levels) > 1
 
@@ -1437,15 +1609,14 @@ class ErectionMethodologyService:
                     level_suffix = f" - {level}" if multi_level else ""
                     stage_grid_range = f"{grid_range}{level_suffix}"
 
-                    # Split elements by structural type
-                    footing_ids = [e.express_id for e in level_elems
-                                   if e.ifc_type in self.STRUCTURAL_TYPES.get('footings', [])]
-                    column_ids = [e.express_id for e in level_elems
-                                  if e.ifc_type in self.STRUCTURAL_TYPES.get('columns', [])]
-                    beam_ids = [e.express_id for e in level_elems
-                                if e.ifc_type in self.STRUCTURAL_TYPES.get('beams', [])]
-                    bracing_ids = [e.express_id for e in level_elems
-                                   if e.ifc_type in self.STRUCTURAL_TYPES.get('bracing', [])]
+                    # Split elements by structural type in one pass
+                    ids_by_category = defaultdict(list)
+                    for e in level_elems:
+                        ids_by_category[type_to_category.get(e.ifc_type)].append(e.express_id)
+                    footing_ids = ids_by_category['footings']
+                    column_ids = ids_by_category['columns']
+                    beam_ids = ids_by_category['beams']
+                    bracing_ids = ids_by_category['bracing']
 
                     # Stage: Foundations (if enabled and found)
                     if include_footings and footing_ids:
@@ -1464,6 +1635,8 @@ class ErectionMethodologyService:
                         )
                         self.stages.append(stage)
                         generated_stages.append(stage.to_dict(include_express_ids=True))
+                        zone_elements[zone_id].extend(stage.elements)
+                        zone_counts[zone_id][stage.element_type] += len(stage.elements)
                         sub_stage += 1
                         stage_order += 1
 
@@ -1484,6 +1657,8 @@ class ErectionMethodologyService:
                         )
                         self.stages.append(stage)
                         generated_stages.append(stage.to_dict(include_express_ids=True))
+                        zone_elements[zone_id].extend(stage.elements)
+                        zone_counts[zone_id][stage.element_type] += len(stage.elements)
                         sub_stage += 1
                         stage_order += 1
 
@@ -1511,19 +1686,16 @@ class ErectionMethodologyService:
                         )
                         self.stages.append(stage)
                         generated_stages.append(stage.to_dict(include_express_ids=True))
+                        zone_elements[zone_id].extend(stage.elements)
+                        zone_counts[zone_id][stage.element_type] += len(stage.elements)
                         sub_stage += 1
                         stage_order += 1
 
             # Update zone with all elements from its stages
-            zone_stages = [s for s in self.stages if s.zone_id == zone_id]
-            all_zone_elements = []
-            element_counts = defaultdict(int)
-            for stage in zone_stages:
-                all_zone_elements.extend(stage.elements)
-                element_counts[stage.element_type] += len(stage.elements)
-            zone.elements = all_zone_elements
-            zone.element_counts = dict(element_counts)
+            zone.elements = list(zone_elements[zone_id])
+            zone.element_counts = dict(zone_counts[zone_id])
 
+        self._rebuild_stage_index()
         return generated_stages
 
     def _generate_rosehill_instructions(
@@ -1536,46 +1708,30 @@ class ErectionMethodologyService:
         """
         Generate Rosehill-style instructions for a stage.
         """
-        u_start = grid_selection['u_start']
-        u_end = grid_selection['u_end']
-
-        if element_type == 'footings':
-            return [
-                f"Install all {count} foundations in {grid_range}",
-                f"Foundations to be placed bay by bay from grid {u_start} through to grid {u_end}",
-                "Verify foundation levels and alignment before grouting",
-                "All holding-down bolts to be checked for position and projection",
-                "Foundations must be signed off before column erection begins",
-            ]
-        elif element_type == 'columns':
-            return [
-                f"Erect all {count} columns in {grid_range}",
-                f"Columns to be installed bay by bay from grid {u_start} through to grid {u_end}",
-                "Columns to be plumbed, aligned, and snug tightened",
-                "Temporary bracing to be installed as required to maintain stability",
-                "Check column plumb and alignment before proceeding to beams",
-            ]
-        elif element_type == 'beams':
-            return [
-                f"Install all {count} beams and bracing in {grid_range}",
-                f"Install beams in each bay from grid {u_start} through grid {u_end}",
-                "Install wall struts, headers and cross bracing as per drawings",
-                "Snug tighten all bolts and tension bracing where applicable",
-                "Ensure all connections are secure before releasing crane",
-            ]
-        else:
+        templates = self._ROSEHILL_TEMPLATES.get(element_type)
+        if templates is None:
             return [f"Install {count} {element_type} elements in {grid_range}"]
 
+        return [
+            template.format(
+                count=count,
+                grid_range=grid_range,
+                u_start=grid_selection['u_start'],
+                u_end=grid_selection['u_end'],
+            )
+            for template in templates
+        ]
+
     def get_express_ids_by_user_stage(self, stage_id: str) -> List[int]:
         """
         Get ExpressIDs for a user-generated stage.
         Stage elements are stored as ExpressIDs directly.
         """
-        for stage in self.stages:
-            if stage.stage_id == stage_id:
-                # Elements in user-generated stages are already ExpressIDs
-                return [int(eid) for eid in stage.elements if eid.isdigit()]
-        return []
+        stage = self._stage_by_id.get(stage_id)
+        if stage is None:
+            return []
+        # Elements in user-generated stages are already ExpressIDs
+        return [int(eid) for eid in stage.elements if eid.isdigit()]
 
     def get_all_ifc_elements_by_grid_area(
         self,
@@ -1589,23 +1745,16 @@ class ErectionMethodologyService:
         This includes walls, slabs, roofing, cladding, doors, windows, MEP, etc.
         Used to show the complete building section for a grid area.
         """
-        # Use actual grid axis positions for coordinate bounds.
-        # U-axes = X coordinates, V-axes = Y coordinates.
-        u_axes_list = sorted(
-            [a for a in self.grid_axes.values() if a.direction == 'U'],
-            key=lambda a: a.position
-        )
-        v_axes_list = sorted(
-            [a for a in self.grid_axes.values() if a.direction == 'V'],
-            key=lambda a: a.position
-        )
-
         if not self.elements:
             return []
 
+        # Use actual grid axis positions for coordinate bounds.
+        # U-axes = X coordinates, V-axes = Y coordinates.
+        self._ensure_grid_caches()
+
         # Try to use actual axis positions first (most accurate)
-        u_positions = [a.position for a in u_axes_list if a.tag in [u_start, u_end]]
-        v_positions = [a.position for a in v_axes_list if a.tag in [v_start, v_end]]
+        u_positions = self._axis_positions(u_start, u_end, self._u_axis_by_tag)
+        v_positions = self._axis_positions(v_start, v_end, self._v_axis_by_tag)
 
         if len(u_positions) >= 2 and len(v_positions) >= 2:
             bound_x_min = min(u_positions) - 500
@@ -1614,77 +1763,57 @@ class ErectionMethodologyService:
             bound_y_max = max(v_positions) + 500
         else:
             # Fallback to proportional method
-            xs = [e.x for e in self.elements.values()]
-            ys = [e.y for e in self.elements.values()]
-            x_min, x_max = min(xs), max(xs)
-            y_min, y_max = min(ys), max(ys)
-            x_range = x_max - x_min if x_max > x_min else 1
-            y_range = y_max - y_min if y_max > y_min else 1
+            if not self._u_tags or not self._v_tags:
+                return []
 
-            u_tags = sorted([a.tag for a in u_axes_list], key=lambda t: ord(t[0].upper()) if t else 0)
-            v_tags = sorted([a.tag for a in v_axes_list], key=lambda t: int(t) if t.isdigit() else 0)
+            bound_x_min, bound_x_max, bound_y_min, bound_y_max = self._proportional_bounds(
+                v_start, v_end, u_start, u_end
+            )
 
-            if not u_tags or not v_tags:
-                return []
+        # Now test ALL IFC building elements (not just structural): bisect the
+        # X-sorted arrays to the box's x-slab, then test Y there
+        self._ensure_building_element_arrays()
+        lo = np.searchsorted(self._building_x, bound_x_min, side='left')
+        hi = np.searchsorted(self._building_x, bound_x_max, side='right')
+        ys = self._building_y[lo:hi]
+        mask = (ys >= bound_y_min) & (ys <= bound_y_max)
 
-            try:
-                u_start_idx = u_tags.index(u_start) if u_start in u_tags else 0
-                u_end_idx = u_tags.index(u_end) if u_end in u_tags else len(u_tags) - 1
-            except Exception:
-                u_start_idx, u_end_idx = 0, len(u_tags) - 1
+        return np.unique(self._building_ids[lo:hi][mask]).tolist()
 
-            try:
-                v_start_idx = v_tags.index(v_start) if v_start in v_tags else 0
-                v_end_idx = v_tags.index(v_end) if v_end in v_tags else len(v_tags) - 1
-            except Exception:
-                v_start_idx, v_end_idx = 0, len(v_tags) - 1
-
-            u_start_idx, u_end_idx = min(u_start_idx, u_end_idx), max(u_start_idx, u_end_idx)
-            v_start_idx, v_end_idx = min(v_start_idx, v_end_idx), max(v_start_idx, v_end_idx)
-
-            num_u = len(u_tags)
-            num_v = len(v_tags)
-
-            bound_x_min = x_min + (u_start_idx / num_u) * x_range - (x_range / num_u / 2)
-            bound_x_max = x_min + ((u_end_idx + 1) / num_u) * x_range + (x_range / num_u / 2)
-            bound_y_min = y_min + (v_start_idx / num_v) * y_range - (y_range / num_v / 2)
-            bound_y_max = y_min + ((v_end_idx + 1) / num_v) * y_range + (y_range / num_v / 2)
-
-        # Now scan ALL IFC building elements (not just structural)
-        all_building_types = [
-            'IfcWall', 'IfcWallStandardCase', 'IfcCurtainWall',
-            'IfcSlab', 'IfcRoof',
-            'IfcColumn', 'IfcBeam', 'IfcMember', 'IfcPlate',
-            'IfcFooting', 'IfcPile',
-            'IfcStair', 'IfcStairFlight', 'IfcRamp', 'IfcRampFlight',
-            'IfcRailing',
-            'IfcDoor', 'IfcWindow',
-            'IfcCovering',
-            'IfcBuildingElementProxy',
-            'IfcDistributionElement', 'IfcFlowSegment', 'IfcFlowTerminal',
-            'IfcFurnishingElement', 'IfcFurniture',
-        ]
+    def _ensure_building_element_arrays(self):
+        """Collect ids and X/Y positions of all IFC building elements once.
+        Placements don't change after load, so every section query reuses them."""
+        if self._building_ids is not None:
+            return
 
-        express_ids = []
+        # by_type() includes subtypes, so the same entity can come back for
+        # several of the types above; place each one only once
+        seen = set()
+        ids, xs, ys = [], [], []
 
-        for ifc_type in all_building_types:
+        for ifc_type in _ALL_BUILDING_TYPES:
             try:
                 elements = self.ifc.by_type(ifc_type)
-                for elem in elements:
-                    try:
-                        # Get element position
-                        if elem.ObjectPlacement:
-                            pos = placement.get_local_placement(elem.ObjectPlacement)
-                            if pos is not None:
-                                ex = pos[0][3]  # X coordinate
-                                ey = pos[1][3]  # Y coordinate
-
-                                # Check if within grid bounds
-                                if bound_x_min <= ex <= bound_x_max and bound_y_min <= ey <= bound_y_max:
-                                    express_ids.append(elem.id())
-                    except:
-                        continue
-            except:
-                continue
-
-        return list(set(express_ids))  # Remove duplicates
+            except RuntimeError:
+                continue  # Type not in this file's schema
+            for elem in elements:
+                elem_id = elem.id()
+                if elem_id in seen:
+                    continue
+                seen.add(elem_id)
+                object_placement = elem.ObjectPlacement
+                if not object_placement:
+                    continue
+                try:
+                    pos = placement.get_local_placement(object_placement)
+                except Exception:
+                    continue  # Malformed placement
+                ids.append(elem_id)
+                xs.append(pos[0][3])  # X coordinate
+                ys.append(pos[1][3])  # Y coordinate
+
+        building_x = np.array(xs, dtype=np.float64)
+        order = np.argsort(building_x, kind='stable')
+        self._building_ids = np.array(ids, dtype=np.int64)[order]
+        self._building_x = building_x[order]
+        self._building_y = np.array(ys, dtype=np.float64)[order]
@@ -16,7 +16,7 @@ try:
 except ImportError:
     pd = None
 
-from .config import settings
+from .config import get_settings
 from .models import (
     ElementCount,
     ElementDetail,
@@ -59,7 +59,7 @@ class IFCService:
     def get_available_files(self) -> List[IFCFileInfo]:
         """Get list of available IFC files in the configured directory."""
         files = []
-        ifc_dir = settings.IFC_DIRECTORY
+        ifc_dir = get_settings().IFC_DIRECTORY
 
         for file_path in ifc_dir.glob("*.ifc"):
             if file_path.is_file():
@@ -294,6 +294,7 @@ class IFCService:
         model = self._get_model(file_id)
 
         if output_dir is None:
+            settings = get_settings()
             output_dir = str(settings.OUTPUT_DIRECTORY / settings.TAKEOFFS_DIR)
 
         os.makedirs(output_dir, exist_ok=True)
@@ -372,6 +373,7 @@ class IFCService:
         model = self._get_model(file_id)
 
         if output_dir is None:
+            settings = get_settings()
             output_dir = str(settings.OUTPUT_DIRECTORY / settings.STOREY_IFCS_DIR)
 
         os.makedirs(output_dir, exist_ok=True)
@@ -457,6 +459,7 @@ class IFCService:
         model = self._get_model(file_id)
 
         if output_path is None:
+            settings = get_settings()
             exports_dir = settings.OUTPUT_DIRECTORY / settings.EXPORTS_DIR
             os.makedirs(exports_dir, exist_ok=True)
             output_path = str(exports_dir / f"{model.file_name}_elements.xlsx")
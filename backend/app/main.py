@@ -13,12 +13,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
-from .config import settings
+from .config import get_settings
 from .ifc_service import ifc_service
 from .models import HealthCheck
 from .routes import analytics, elements, exports, files, storeys, takeoffs, methodology, review
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 # Frontend static build directory (built by CI/CD pipeline)
 FRONTEND_DIR = Path(__file__).parent.parent.parent / "frontend" / "dist"
@@ -70,7 +71,8 @@ app = FastAPI(
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
+    allow_origins=settings.cors_allow_origins,
+    allow_origin_regex=settings.cors_allow_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -8,7 +8,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-from .config import settings
+from .config import get_settings
 from .models import (
     AISuggestion,
     MethodologyReview,
@@ -51,6 +51,7 @@ class ReviewService:
     """Service for methodology review with AI and rule-based analysis."""
 
     def __init__(self):
+        settings = get_settings()
         self._reviews: Dict[str, MethodologyReview] = {}
         self._reviews_dir = settings.OUTPUT_DIRECTORY / "reviews"
         os.makedirs(self._reviews_dir, exist_ok=True)
@@ -346,7 +347,7 @@ class ReviewService:
 
             # Call OpenAI
             response = self._openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
+                model=get_settings().OPENAI_MODEL,
                 messages=[
                     {
                         "role": "system",
@@ -38,8 +38,9 @@ async def export_to_excel(
 @router.get("/download/{filename}")
 async def download_export(filename: str):
     """Download an exported file."""
-    from ..config import settings
+    from ..config import get_settings
 
+    settings = get_settings()
     exports_dir = settings.IFC_DIRECTORY / settings.EXPORTS_DIR
     file_path = exports_dir / filename
 
@@ -11,7 +11,7 @@ from fastapi.responses import FileResponse
 
 from ..ifc_service import ifc_service
 from ..models import APIResponse, IFCFileInfo, IFCFileListResponse
-from ..config import settings
+from ..config import get_settings
 
 router = APIRouter(prefix="/files", tags=["Files"])
 
@@ -29,7 +29,8 @@ async def upload_file(file: UploadFile = File(...)):
     if not file.filename:
         raise HTTPException(status_code=400, detail="No file provided")
 
-    if not file.filename.lower().endswith('.ifc'):
+    settings = get_settings()
+    if os.path.splitext(file.filename)[1].lower() not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Only .ifc files are allowed")
 
     # Ensure upload directory exists
@@ -215,7 +215,7 @@ async def get_stage(stage_id: str, file_id: Optional[str] = Query(None)):
 
     service = get_methodology_service(file_id)
 
-    stage = next((s for s in service.stages if s.stage_id == stage_id), None)
+    stage = service.get_stage(stage_id)
     if not stage:
         raise HTTPException(status_code=404, detail=f"Stage {stage_id} not found")
 
@@ -256,7 +256,7 @@ async def get_elements(
             elements = [e for e in elements if e.global_id in zone_element_ids]
 
     if stage_id:
-        stage = next((s for s in service.stages if s.stage_id == stage_id), None)
+        stage = service.get_stage(stage_id)
         if stage:
             stage_element_ids = set(stage.elements)
             elements = [e for e in elements if e.global_id in stage_element_ids]
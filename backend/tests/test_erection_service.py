@@ -0,0 +1,158 @@
+"""
+Tests for the erection methodology service, on small IFC models built in memory.
+
+Run from backend/: python -m unittest discover -s tests -t .
+"""
+import unittest
+
+import ifcopenshell
+import ifcopenshell.api
+
+from app.erection_service import ErectionMethodologyService
+
+
+def build_model(elements, storeys=(("Ground Floor", 0.0),)):
+    """
+    Build an IFC4 model with the given storeys and elements.
+    Each element is (ifc_class, x, y, z, storey_index).
+    Returns (ifc_file, {ifc_class index -> entity}).
+    """
+    f = ifcopenshell.api.run("project.create_file", version="IFC4")
+    project = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcProject", name="Project")
+    ifcopenshell.api.run("unit.assign_unit", f)
+    site = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcSite", name="Site")
+    building = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcBuilding", name="Building")
+    ifcopenshell.api.run("aggregate.assign_object", f, relating_object=project, products=[site])
+    ifcopenshell.api.run("aggregate.assign_object", f, relating_object=site, products=[building])
+
+    storey_entities = []
+    for name, elevation in storeys:
+        storey = ifcopenshell.api.run("root.create_entity", f, ifc_class="IfcBuildingStorey", name=name)
+        storey.Elevation = elevation
+        ifcopenshell.api.run("aggregate.assign_object", f, relating_object=building, products=[storey])
+        storey_entities.append(storey)
+
+    created = []
+    for ifc_class, x, y, z, storey_index in elements:
+        elem = ifcopenshell.api.run("root.create_entity", f, ifc_class=ifc_class, name=f"{ifc_class} {x},{y}")
+        origin = f.createIfcAxis2Placement3D(f.createIfcCartesianPoint((float(x), float(y), float(z))))
+        elem.ObjectPlacement = f.createIfcLocalPlacement(None, origin)
+        ifcopenshell.api.run(
+            "spatial.assign_container", f,
+            relating_structure=storey_entities[storey_index], products=[elem]
+        )
+        created.append(elem)
+    return f, created
+
+
+class ZoneDetectionTests(unittest.TestCase):
+
+    def test_zone_membership_matches_reported_ranges_at_max_edge(self):
+        # x spans 3357.7 .. 98272.8 (4 zones), where the last zone's reported upper
+        # bound rounds to just above x_max; y_max sits exactly on the upper bound
+        f, _ = build_model([
+            ("IfcColumn", 3357.7, 0.0, 0.0, 0),
+            ("IfcColumn", 50000.0, 1000.0, 0.0, 0),
+            ("IfcColumn", 98272.8, 500.0, 0.0, 0),
+        ])
+        service = ErectionMethodologyService(f)
+        service.analyze()
+
+        zone_by_element = {}
+        for zone in service.zones.values():
+            for eid in zone.elements:
+                zone_by_element.setdefault(eid, []).append(zone.zone_id)
+
+        for elem in service.elements.values():
+            expected = [
+                zone.zone_id for zone in service.zones.values()
+                if zone.x_range[0] <= elem.x < zone.x_range[1]
+                and zone.y_range[0] <= elem.y < zone.y_range[1]
+            ]
+            self.assertEqual(zone_by_element.get(elem.global_id, []), expected, elem.name)
+
+        # The element at x_max is inside the last zone's reported range, so it is staged
+        max_x_elem = max(service.elements.values(), key=lambda e: e.x)
+        self.assertIn(max_x_elem.global_id, zone_by_element)
+        staged = {eid for stage in service.stages for eid in stage.elements}
+        self.assertIn(max_x_elem.global_id, staged)
+
+    def test_reanalyze_rebuilds_zones_and_stages(self):
+        f, _ = build_model([
+            ("IfcColumn", 0.0, 0.0, 0.0, 0),
+            ("IfcColumn", 6000.0, 1000.0, 0.0, 0),
+            ("IfcBeam", 3000.0, 500.0, 0.0, 0),
+        ])
+        service = ErectionMethodologyService(f)
+        service.analyze()
+        first = [(s.stage_id, s.sequence_order, sorted(s.elements)) for s in service.stages]
+        zone_elements = {z.zone_id: sorted(z.elements) for z in service.zones.values()}
+
+        service.analyze()
+        self.assertEqual([(s.stage_id, s.sequence_order, sorted(s.elements)) for s in service.stages], first)
+        self.assertEqual({z.zone_id: sorted(z.elements) for z in service.zones.values()}, zone_elements)
+
+        # Each stage owns its element list
+        lists = [id(s.elements) for s in service.stages]
+        lists += [id(ids) for ids in service._zone_level_category.values()]
+        self.assertEqual(len(lists), len(set(lists)))
+
+
+class GridAreaTests(unittest.TestCase):
+
+    def test_proportional_bounds_keep_element_on_rounded_edge_out(self):
+        # Element x spans 0 .. 55000, so the virtual grid has 7 U divisions (A-G) and
+        # the A-C area ends at 0 + (3 / 7) * 55000 + 55000 / 7 / 2 = 27499.999999999996
+        f, (_, edge_column, _) = build_model([
+            ("IfcColumn", 0.0, 0.0, 0.0, 0),
+            ("IfcColumn", 27500.0, 500.0, 0.0, 0),
+            ("IfcColumn", 55000.0, 1000.0, 0.0, 0),
+        ])
+        service = ErectionMethodologyService(f)
+        service.analyze()
+        service._ensure_grid_caches()
+        self.assertEqual(service._u_tags, list("ABCDEFG"))
+
+        x_start, x_end, _, _ = service._proportional_bounds(
+            service._v_tags[0], service._v_tags[-1], "A", "C"
+        )
+        self.assertEqual(x_end, 27499.999999999996)
+        ids = service._get_express_ids_by_proportional_grid(
+            service._v_tags[0], service._v_tags[-1], "A", "C"
+        )
+        self.assertNotIn(edge_column.id(), ids)
+
+
+class ElementPropertyTests(unittest.TestCase):
+
+    def test_last_property_set_in_file_order_wins_on_shared_names(self):
+        f, (wall,) = build_model([("IfcWall", 0.0, 0.0, 0.0, 0)])
+        for name, reference in (("Pset_WallCommon", "W-01"), ("Pset_Custom", "W-99"), ("Pset_Other", "W-50")):
+            pset = ifcopenshell.api.run("pset.add_pset", f, product=wall, name=name)
+            ifcopenshell.api.run("pset.edit_pset", f, pset=pset, properties={"Reference": reference})
+
+        service = ErectionMethodologyService(f)
+        service.analyze()
+
+        self.assertEqual(service.elements[wall.GlobalId].properties["Reference"], "W-50")
+
+    def test_reanalyze_does_not_duplicate_relationship_index(self):
+        f, (wall,) = build_model([("IfcWall", 0.0, 0.0, 0.0, 0)])
+        for name in ("Pset_WallCommon", "Pset_Custom"):
+            pset = ifcopenshell.api.run("pset.add_pset", f, product=wall, name=name)
+            ifcopenshell.api.run("pset.edit_pset", f, pset=pset, properties={"Reference": name})
+
+        service = ErectionMethodologyService(f)
+        service.analyze()
+        psets = list(service._elem_to_psets[wall.id()])
+        storeys = dict(service._elem_to_storey)
+
+        service.analyze()
+        self.assertEqual(service._elem_to_psets[wall.id()], psets)
+        self.assertEqual(len(psets), 2)
+        self.assertEqual(service._elem_to_storey, storeys)
+        self.assertEqual(service.elements[wall.GlobalId].properties["Reference"], "Pset_Custom")
+
+
+if __name__ == "__main__":
+    unittest.main()